@@ -7,9 +7,11 @@ The actual implementation is split across multiple modules for maintainability:
 
 - fetcher/config.py      - Configuration constants and thresholds
 - fetcher/manifest.py    - Manifest file operations
+- fetcher/jsonio.py      - JSON serialization (orjson when available)
 - fetcher/paths.py       - Path conversion and categorization
 - fetcher/sitemap.py     - Sitemap discovery and parsing
 - fetcher/content.py     - Content fetching and validation
+- fetcher/ratelimit.py   - Rate limiting shared by concurrent fetches
 - fetcher/safeguards.py  - Safety checks to prevent mass deletion
 - fetcher/cli.py         - Main entry point
 
@@ -21,6 +23,8 @@ from fetcher import (
     # Config
     SITEMAP_URLS,
     MANIFEST_FILE,
+    CHECKPOINT_INTERVAL,
+    SITEMAP_CACHE_FILE,
     HEADERS,
     MAX_RETRIES,
     RETRY_DELAY,
@@ -29,9 +33,12 @@ from fetcher import (
     MIN_DISCOVERY_THRESHOLD,
     MAX_DELETION_PERCENT,
     MIN_EXPECTED_FILES,
+    MAX_WORKERS,
+    STREAM_CHUNK_SIZE,
     # Manifest
     load_manifest,
     save_manifest,
+    checkpoint_manifest,
     validate_repository_config,
     # Paths
     url_to_safe_filename,
@@ -44,12 +51,18 @@ from fetcher import (
     discover_from_all_sitemaps,
     discover_sitemap_and_base_url,
     discover_claude_code_pages,
+    load_sitemap_cache,
+    save_sitemap_cache,
     # Content
     validate_markdown_content,
     fetch_markdown_content,
     fetch_changelog,
     save_markdown_file,
     content_has_changed,
+    compute_content_hash,
+    HASH_ALGO,
+    # Rate limiting
+    RateLimiter,
     # Safeguards
     cleanup_old_files,
     validate_discovery_threshold,
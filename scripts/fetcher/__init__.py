@@ -10,6 +10,8 @@ Main entry point: run_fetcher() or use fetch_claude_docs.py wrapper
 from .config import (
     SITEMAP_URLS,
     MANIFEST_FILE,
+    CHECKPOINT_INTERVAL,
+    SITEMAP_CACHE_FILE,
     HEADERS,
     MAX_RETRIES,
     RETRY_DELAY,
@@ -18,11 +20,14 @@ from .config import (
     MIN_DISCOVERY_THRESHOLD,
     MAX_DELETION_PERCENT,
     MIN_EXPECTED_FILES,
+    MAX_WORKERS,
+    STREAM_CHUNK_SIZE,
 )
 
 from .manifest import (
     load_manifest,
     save_manifest,
+    checkpoint_manifest,
     validate_repository_config,
 )
 
@@ -40,6 +45,8 @@ from .sitemap import (
     discover_from_all_sitemaps,
     discover_sitemap_and_base_url,
     discover_claude_code_pages,
+    load_sitemap_cache,
+    save_sitemap_cache,
 )
 
 from .content import (
@@ -48,8 +55,12 @@ from .content import (
     fetch_changelog,
     save_markdown_file,
     content_has_changed,
+    compute_content_hash,
+    HASH_ALGO,
 )
 
+from .ratelimit import RateLimiter
+
 from .safeguards import (
     cleanup_old_files,
     validate_discovery_threshold,
@@ -61,6 +72,8 @@ __all__ = [
     # Config
     'SITEMAP_URLS',
     'MANIFEST_FILE',
+    'CHECKPOINT_INTERVAL',
+    'SITEMAP_CACHE_FILE',
     'HEADERS',
     'MAX_RETRIES',
     'RETRY_DELAY',
@@ -69,9 +82,12 @@ __all__ = [
     'MIN_DISCOVERY_THRESHOLD',
     'MAX_DELETION_PERCENT',
     'MIN_EXPECTED_FILES',
+    'MAX_WORKERS',
+    'STREAM_CHUNK_SIZE',
     # Manifest
     'load_manifest',
     'save_manifest',
+    'checkpoint_manifest',
     'validate_repository_config',
     # Paths
     'url_to_safe_filename',
@@ -85,12 +101,18 @@ __all__ = [
     'discover_from_all_sitemaps',
     'discover_sitemap_and_base_url',
     'discover_claude_code_pages',
+    'load_sitemap_cache',
+    'save_sitemap_cache',
     # Content
     'validate_markdown_content',
     'fetch_markdown_content',
     'fetch_changelog',
     'save_markdown_file',
     'content_has_changed',
+    'compute_content_hash',
+    'HASH_ALGO',
+    # Rate limiting
+    'RateLimiter',
     # Safeguards
     'cleanup_old_files',
     'validate_discovery_threshold',
@@ -7,38 +7,127 @@ documentation fetching process.
 
 import os
 import sys
-import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
+from types import MappingProxyType
+from typing import Optional, Set
 
 import requests
-
-from .config import RATE_LIMIT_DELAY, logger
-from .manifest import load_manifest, save_manifest, validate_repository_config
-from .sitemap import discover_from_all_sitemaps, discover_sitemap_and_base_url
-from .paths import load_paths_from_manifest, update_paths_manifest
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .config import (
+    CHECKPOINT_INTERVAL,
+    FETCH_QUEUE_SIZE,
+    HTTP_CONNECT_RETRIES,
+    HTTP_RETRY_BACKOFF,
+    MAX_WORKERS,
+    RATE_LIMIT_DELAY,
+    logger,
+)
+from .manifest import (
+    checkpoint_manifest,
+    load_manifest,
+    save_manifest,
+    validate_repository_config,
+)
+from .sitemap import (
+    discover_from_all_sitemaps,
+    discover_sitemap_and_base_url,
+    load_sitemap_cache,
+    save_sitemap_cache,
+)
+from .paths import load_paths_from_manifest, update_paths_manifest, url_to_safe_filename
 from .content import (
+    HASH_ALGO,
+    LEGACY_HASH_ALGO,
     fetch_markdown_content,
     fetch_changelog,
     save_markdown_file,
+    compute_content_hash,
     content_has_changed,
 )
+from .ratelimit import RateLimiter
 from .safeguards import cleanup_old_files, validate_discovery_threshold
 
-
-def main():
-    """Main function with improved robustness."""
+# Shared read-only default for files missing from the previous manifest
+_EMPTY_ENTRY = MappingProxyType({})
+
+
+def create_session() -> requests.Session:
+    """
+    Create an HTTP session sized for concurrent fetching.
+
+    The connection pool holds one connection per fetch worker so
+    connections are reused instead of re-opened. Only failed connection
+    attempts are retried at the transport level; HTTP errors are left to
+    the fetch functions' own retry loops, which go through the shared
+    rate limiter.
+
+    Returns:
+        Configured requests session
+    """
+    session = requests.Session()
+    retries = Retry(
+        total=HTTP_CONNECT_RETRIES,
+        connect=HTTP_CONNECT_RETRIES,
+        read=0,
+        backoff_factor=HTTP_RETRY_BACKOFF,
+    )
+    adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS, max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _fetch_page(
+    page_path: str,
+    session: requests.Session,
+    base_url: str,
+    limiter: RateLimiter,
+    previous_files: dict,
+    existing_files: Set[str],
+):
+    """
+    Fetch a single page, pacing every attempt with the shared rate limiter (runs in a worker thread).
+
+    Cache validators from the previous manifest are only sent while the file is
+    still on disk, so a deleted file is always downloaded again.
+    """
+    filename = url_to_safe_filename(page_path)
+    old_entry = previous_files.get(filename, _EMPTY_ENTRY)
+    etag = last_modified = None
+    if filename in existing_files:
+        etag = old_entry.get("etag")
+        last_modified = old_entry.get("last_modified")
+
+    return fetch_markdown_content(
+        page_path, session, base_url, etag=etag, last_modified=last_modified, limiter=limiter
+    )
+
+
+def main(docs_dir: Optional[Path] = None):
+    """
+    Main function with improved robustness.
+
+    Args:
+        docs_dir: Output directory (defaults to docs/ at the repository root)
+    """
     start_time = datetime.now()
     logger.info("Starting documentation update (updating existing local files only)")
 
     # Log configuration
     github_repo = os.environ.get('GITHUB_REPOSITORY', 'seanGSISG/claude-code-docs')
-    logger.info(f"GitHub repository: {github_repo}")
+    logger.info("GitHub repository: %s", github_repo)
 
     # Create docs directory at repository root
-    docs_dir = Path(__file__).parent.parent.parent / 'docs'
+    if docs_dir is None:
+        docs_dir = Path(__file__).parent.parent.parent / 'docs'
     docs_dir.mkdir(exist_ok=True)
-    logger.info(f"Output directory: {docs_dir}")
+    logger.info("Output directory: %s", docs_dir)
 
     # Load manifest
     manifest = load_manifest(docs_dir)
@@ -46,21 +135,58 @@ def main():
     # Validate repository configuration
     validate_repository_config(manifest)
 
+    # Entries from the previous run, looked up once per page
+    files_map = manifest.get("files") or {}
+
+    # Hashes written with another algorithm can't be compared directly. Those
+    # pages are downloaded in full once (no conditional requests) and compared
+    # using the old algorithm, so unchanged files keep their timestamps. An
+    # entry may record its own "hash_algo" when a rehash run was interrupted.
+    old_hash_algo = manifest.get("hash_algo", LEGACY_HASH_ALGO)
+    stale_algos = {
+        filename: entry.get("hash_algo", old_hash_algo)
+        for filename, entry in files_map.items()
+        if entry.get("hash_algo", old_hash_algo) != HASH_ALGO
+    }
+    if stale_algos:
+        logger.info("Rehashing %d pages with %s", len(stale_algos), HASH_ALGO)
+        conditional_files = {name: entry for name, entry in files_map.items() if name not in stale_algos}
+    else:
+        conditional_files = files_map
+
+    # Checkpoints are written with the new algorithm. Pages not reached yet
+    # keep their previous entry, tagged with the algorithm of its hash.
+    checkpoint_base = {
+        **manifest,
+        "hash_algo": HASH_ALGO,
+        "files": {
+            **files_map,
+            **{name: {**files_map[name], "hash_algo": algo} for name, algo in stale_algos.items()},
+        },
+    }
+
+    # One directory listing instead of a stat() per page
+    with os.scandir(docs_dir) as entries:
+        existing_files = {entry.name for entry in entries if entry.is_file()}
+
     # Statistics
     successful = 0
     failed = 0
     failed_pages = []
     fetched_files = set()
-    new_manifest = {"files": {}}
+    new_manifest = {"hash_algo": HASH_ALGO, "files": {}}
 
     # Create a session for connection pooling
     sitemap_url = None
-    with requests.Session() as session:
+    with create_session() as session:
+        # Unchanged sitemaps (304 Not Modified) reuse what was cached last run
+        sitemap_cache = load_sitemap_cache(docs_dir)
+
         # Discover sitemap and base URL
         try:
-            sitemap_url, base_url = discover_sitemap_and_base_url(session)
+            sitemap_url, base_url = discover_sitemap_and_base_url(session, cache=sitemap_cache)
         except Exception as e:
-            logger.error(f"Failed to discover sitemap: {e}")
+            logger.error("Failed to discover sitemap: %s", e)
             logger.info("Using fallback configuration...")
             base_url = "https://platform.claude.com"  # Primary docs domain
             sitemap_url = None
@@ -68,88 +194,147 @@ def main():
         # Discover ALL documentation paths from sitemaps
         logger.info("Discovering all /en/ documentation paths from sitemaps...")
         try:
-            documentation_pages = discover_from_all_sitemaps(session)
+            documentation_pages = discover_from_all_sitemaps(session, cache=sitemap_cache)
+            try:
+                save_sitemap_cache(docs_dir, sitemap_cache)
+            except Exception as e:
+                logger.warning("Failed to save sitemap cache: %s", e)
 
             # Auto-regenerate paths_manifest.json with fresh discovered paths
             try:
                 update_paths_manifest(documentation_pages)
                 logger.info("Successfully regenerated paths_manifest.json from sitemap discovery")
             except Exception as e:
-                logger.warning(f"Failed to update paths_manifest.json: {e}")
+                logger.warning("Failed to update paths_manifest.json: %s", e)
                 # Non-fatal - continue with fetch
 
         except Exception as e:
-            logger.error(f"Sitemap discovery failed: {e}")
+            logger.error("Sitemap discovery failed: %s", e)
             logger.warning("Falling back to local file detection...")
             # Fallback: load paths for existing local files
             documentation_pages = load_paths_from_manifest()
 
         # Validate discovery threshold (safeguard)
         documentation_pages = validate_discovery_threshold(documentation_pages)
-
-        # Fetch each discovered page
-        for i, page_path in enumerate(documentation_pages, 1):
-            logger.info(f"Processing {i}/{len(documentation_pages)}: {page_path}")
-
+        total_pages = len(documentation_pages)
+
+        # Unchanged pages can keep their stored URLs while the base URL is the same
+        reuse_urls = (manifest.get("fetch_metadata") or {}).get("base_url") == base_url
+
+        # Fetch pages concurrently; the limiter keeps the global request rate
+        # within RATE_LIMIT_DELAY. Results are consumed in discovery order on
+        # this thread so manifest updates need no locking. Only a small window
+        # of fetches is queued ahead of the consumer, and each future is
+        # dropped once consumed so page bodies don't stay in memory.
+        limiter = RateLimiter(RATE_LIMIT_DELAY)
+        page_iter = iter(documentation_pages)
+        pending = deque()
+
+        def submit_pages(count: int) -> None:
+            for page_path in islice(page_iter, count):
+                pending.append(executor.submit(
+                    _fetch_page, page_path, session, base_url, limiter,
+                    conditional_files, existing_files,
+                ))
+
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
             try:
-                filename, content = fetch_markdown_content(page_path, session, base_url)
-
-                # Check if content has changed OR file doesn't exist on disk
-                old_hash = manifest.get("files", {}).get(filename, {}).get("hash", "")
-                old_entry = manifest.get("files", {}).get(filename, {})
-                file_path = docs_dir / filename
-                file_exists = file_path.exists()
-
-                if content_has_changed(content, old_hash) or not file_exists:
-                    content_hash = save_markdown_file(docs_dir, filename, content)
-                    if not file_exists:
-                        logger.info(f"Created: {filename}")
-                    else:
-                        logger.info(f"Updated: {filename}")
-                    # Only update timestamp when content actually changes
-                    last_updated = datetime.now().isoformat()
-                else:
-                    content_hash = old_hash
-                    logger.info(f"Unchanged: {filename}")
-                    # Keep existing timestamp for unchanged files
-                    last_updated = old_entry.get("last_updated", datetime.now().isoformat())
-
-                new_manifest["files"][filename] = {
-                    "original_url": f"{base_url}{page_path}",
-                    "original_md_url": f"{base_url}{page_path}.md",
-                    "hash": content_hash,
-                    "last_updated": last_updated
-                }
-
-                fetched_files.add(filename)
-                successful += 1
-
-                # Rate limiting
-                if i < len(documentation_pages):
-                    time.sleep(RATE_LIMIT_DELAY)
-
-            except Exception as e:
-                logger.error(f"Failed to process {page_path}: {e}")
-                failed += 1
-                failed_pages.append(page_path)
-
-    # Fetch Claude Code changelog
-    logger.info("Fetching Claude Code changelog...")
+                # The changelog comes from another host and doesn't count against
+                # the docs rate limit; start it first so it overlaps the page fetches
+                logger.info("Fetching Claude Code changelog...")
+                changelog_future = executor.submit(fetch_changelog, session)
+
+                submit_pages(FETCH_QUEUE_SIZE)
+                for i, page_path in enumerate(documentation_pages, 1):
+                    logger.info("Processing %d/%d: %s", i, total_pages, page_path)
+
+                    try:
+                        future = pending.popleft()
+                        submit_pages(1)  # keep the window full, even if this page failed
+                        filename, content, validators = future.result()
+
+                        # Check if content has changed OR file doesn't exist on disk
+                        old_entry = files_map.get(filename, _EMPTY_ENTRY)
+                        old_hash = old_entry.get("hash", "")
+                        file_exists = filename in existing_files
+
+                        # Hash once; a 304 Not Modified (content is None) keeps the previous hash
+                        content_hash = old_hash if content is None else compute_content_hash(content)
+                        if filename in stale_algos and content is not None:
+                            changed = content_has_changed(content, old_hash, stale_algos[filename])
+                        else:
+                            changed = content_hash != old_hash
+
+                        if content is not None and (changed or not file_exists):
+                            save_markdown_file(docs_dir, filename, content, content_hash=content_hash)
+                            existing_files.add(filename)
+                            if not file_exists:
+                                logger.info("Created: %s", filename)
+                            else:
+                                logger.info("Updated: %s", filename)
+                            # Only update timestamp when content actually changes
+                            last_updated = datetime.now().isoformat()
+                        else:
+                            logger.info("Unchanged: %s", filename)
+                            # Keep existing timestamp for unchanged files (the clock
+                            # is only read when the previous entry has none)
+                            last_updated = old_entry.get("last_updated") or datetime.now().isoformat()
+
+                        if reuse_urls and "original_url" in old_entry and "original_md_url" in old_entry:
+                            original_url = old_entry["original_url"]
+                            original_md_url = old_entry["original_md_url"]
+                        else:
+                            original_url = f"{base_url}{page_path}"
+                            original_md_url = f"{original_url}.md"
+
+                        new_manifest["files"][filename] = {
+                            "original_url": original_url,
+                            "original_md_url": original_md_url,
+                            "hash": content_hash,
+                            "last_updated": last_updated,
+                            **validators,
+                        }
+
+                        fetched_files.add(filename)
+                        successful += 1
+
+                    except Exception as e:
+                        logger.error("Failed to process %s: %s", page_path, e)
+                        failed += 1
+                        failed_pages.append(page_path)
+
+                    # Periodically persist progress so a crash doesn't lose it
+                    if i % CHECKPOINT_INTERVAL == 0:
+                        try:
+                            checkpoint_manifest(docs_dir, checkpoint_base, new_manifest["files"])
+                        except Exception as e:
+                            logger.warning("Failed to checkpoint manifest: %s", e)
+            except BaseException:
+                # Error or interrupt: don't wait for queued fetches on the way out
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    # Process Claude Code changelog (fetched alongside the pages)
     try:
-        filename, content = fetch_changelog(session)
+        filename, content = changelog_future.result()
 
         # Check if content has changed
-        old_hash = manifest.get("files", {}).get(filename, {}).get("hash", "")
-        old_entry = manifest.get("files", {}).get(filename, {})
+        old_entry = files_map.get(filename, _EMPTY_ENTRY)
+        old_hash = old_entry.get("hash", "")
+
+        content_hash = compute_content_hash(content)
+        if filename in stale_algos:
+            changed = content_has_changed(content, old_hash, stale_algos[filename])
+        else:
+            changed = content_hash != old_hash
 
-        if content_has_changed(content, old_hash):
-            content_hash = save_markdown_file(docs_dir, filename, content)
-            logger.info(f"Updated: {filename}")
+        if changed:
+            save_markdown_file(docs_dir, filename, content, content_hash=content_hash)
+            logger.info("Updated: %s", filename)
             last_updated = datetime.now().isoformat()
         else:
-            content_hash = old_hash
-            logger.info(f"Unchanged: {filename}")
-            last_updated = old_entry.get("last_updated", datetime.now().isoformat())
+            logger.info("Unchanged: %s", filename)
+            last_updated = old_entry.get("last_updated") or datetime.now().isoformat()
 
         new_manifest["files"][filename] = {
             "original_url": "https://github.com/anthropics/claude-code/blob/main/CHANGELOG.md",
@@ -163,18 +348,19 @@ def main():
         successful += 1
 
     except Exception as e:
-        logger.error(f"Failed to fetch changelog: {e}")
+        logger.error("Failed to fetch changelog: %s", e)
         failed += 1
         failed_pages.append("changelog")
 
     # Clean up old files (only those we previously fetched)
-    cleanup_old_files(docs_dir, fetched_files, manifest)
+    cleanup_old_files(docs_dir, fetched_files, manifest, existing_files)
 
     # Add metadata to manifest
+    completed_time = datetime.now()
     new_manifest["fetch_metadata"] = {
-        "last_fetch_completed": datetime.now().isoformat(),
-        "fetch_duration_seconds": (datetime.now() - start_time).total_seconds(),
-        "total_pages_discovered": len(documentation_pages),
+        "last_fetch_completed": completed_time.isoformat(),
+        "fetch_duration_seconds": (completed_time - start_time).total_seconds(),
+        "total_pages_discovered": total_pages,
         "pages_fetched_successfully": successful,
         "pages_failed": failed,
         "failed_pages": failed_pages,
@@ -190,15 +376,15 @@ def main():
     # Summary
     duration = datetime.now() - start_time
     logger.info("\n" + "="*50)
-    logger.info(f"Fetch completed in {duration}")
-    logger.info(f"Discovered pages: {len(documentation_pages)}")
-    logger.info(f"Successful: {successful}/{len(documentation_pages)}")
-    logger.info(f"Failed: {failed}")
+    logger.info("Fetch completed in %s", duration)
+    logger.info("Discovered pages: %s", total_pages)
+    logger.info("Successful: %d/%d", successful, total_pages)
+    logger.info("Failed: %s", failed)
 
     if failed_pages:
         logger.warning("\nFailed pages (will retry next run):")
         for page in failed_pages:
-            logger.warning(f"  - {page}")
+            logger.warning("  - %s", page)
         # Don't exit with error - partial success is OK
         if successful == 0:
             logger.error("No pages were fetched successfully!")
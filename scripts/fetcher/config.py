@@ -34,6 +34,8 @@ SITEMAP_URLS = [
 # FILE CONFIGURATION
 # =============================================================================
 MANIFEST_FILE = "docs_manifest.json"
+CHECKPOINT_INTERVAL = 50  # save fetch progress to the manifest every N pages
+SITEMAP_CACHE_FILE = ".sitemap_cache.json"  # sitemap validators + discovered paths, next to the manifest
 
 
 # =============================================================================
@@ -56,6 +58,19 @@ RETRY_DELAY = 2  # initial delay in seconds
 MAX_RETRY_DELAY = 30  # maximum delay in seconds
 RATE_LIMIT_DELAY = 0.5  # seconds between requests
 
+# Transport-level retries only cover connections that failed before the request
+# was sent; HTTP errors are retried (rate limited) by the fetch loops themselves
+HTTP_CONNECT_RETRIES = 1
+HTTP_RETRY_BACKOFF = 0.3  # seconds, doubled per attempt
+
+
+# =============================================================================
+# CONCURRENCY CONFIGURATION
+# =============================================================================
+MAX_WORKERS = 8  # concurrent page fetches (global rate still capped by RATE_LIMIT_DELAY)
+FETCH_QUEUE_SIZE = 2 * MAX_WORKERS  # page fetches queued ahead of the consumer
+STREAM_CHUNK_SIZE = 64 * 1024  # bytes read per chunk when streaming response bodies
+
 
 # =============================================================================
 # SAFETY THRESHOLDS - Prevent catastrophic deletion from sitemap failures
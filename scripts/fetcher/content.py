@@ -9,18 +9,22 @@ This module handles:
 """
 
 import hashlib
+import os
 import random
+import re
 import time
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Optional, Tuple, Union
 
 import requests
+import xxhash
 
 from .config import (
     HEADERS,
     MAX_RETRIES,
     RETRY_DELAY,
     MAX_RETRY_DELAY,
+    STREAM_CHUNK_SIZE,
     logger,
 )
 from .paths import (
@@ -28,6 +32,22 @@ from .paths import (
     convert_legacy_path_to_fetch_url,
     get_base_url_for_path,
 )
+from .ratelimit import RateLimiter
+
+# Algorithm recorded as the manifest's "hash_algo". The hash only detects
+# changed content (there is no adversary), so the fast non-cryptographic
+# xxh3 is used. xxhash is a required dependency: a run that could not
+# compute the stored algorithm would report every page as changed.
+HASH_ALGO = 'xxh3_64'
+
+# Manifests written before "hash_algo" existed used SHA256
+LEGACY_HASH_ALGO = 'sha256'
+
+# An HTML document type declaration, matched only at the start of fetched content
+_HTML_DOCTYPE = re.compile(r'<!doctype', re.IGNORECASE)
+
+# Words expected somewhere in a documentation page
+_DOC_PATTERN_RE = re.compile(r'installation|usage|example|api|configuration|claude|code', re.IGNORECASE)
 
 
 def validate_markdown_content(content: str, filename: str) -> None:
@@ -42,7 +62,7 @@ def validate_markdown_content(content: str, filename: str) -> None:
         ValueError: If validation fails
     """
     # Check for HTML content
-    if not content or content.startswith('<!DOCTYPE') or '<html' in content[:100]:
+    if not content or _HTML_DOCTYPE.match(content) or content.find('<html', 0, 100) != -1:
         raise ValueError("Received HTML instead of markdown")
 
     # Check minimum length
@@ -78,25 +98,70 @@ def validate_markdown_content(content: str, filename: str) -> None:
         raise ValueError(f"Content doesn't appear to be markdown (only {indicator_count} markdown indicators found)")
 
     # Check for common documentation patterns
-    doc_patterns = ['installation', 'usage', 'example', 'api', 'configuration', 'claude', 'code']
-    content_lower = content.lower()
-    pattern_found = any(pattern in content_lower for pattern in doc_patterns)
+    if not _DOC_PATTERN_RE.search(content):
+        logger.warning("Content for %s doesn't contain expected documentation patterns", filename)
+
+
+def _response_validators(response: requests.Response) -> Dict[str, str]:
+    """
+    Extract cache validators from a response for later conditional requests.
+
+    Args:
+        response: HTTP response
+
+    Returns:
+        Dictionary with 'etag' and/or 'last_modified' keys (only those present)
+    """
+    validators = {}
+    etag = response.headers.get('ETag')
+    if etag:
+        validators['etag'] = etag
+    last_modified = response.headers.get('Last-Modified')
+    if last_modified:
+        validators['last_modified'] = last_modified
+    return validators
+
+
+def _read_body(response: requests.Response) -> bytes:
+    """
+    Read a streamed response body in large chunks.
 
-    if not pattern_found:
-        logger.warning(f"Content for {filename} doesn't contain expected documentation patterns")
+    Args:
+        response: HTTP response requested with stream=True
 
+    Returns:
+        Raw response body
+    """
+    return b"".join(response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
 
-def fetch_markdown_content(path: str, session: requests.Session, base_url: str) -> Tuple[str, str]:
+
+def fetch_markdown_content(
+    path: str,
+    session: requests.Session,
+    base_url: str,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+    limiter: Optional[RateLimiter] = None,
+) -> Tuple[str, Optional[bytes], Dict[str, str]]:
     """
     Fetch markdown content with better error handling and validation.
 
+    When an ETag or Last-Modified value from a previous fetch is supplied,
+    a conditional request is sent and a 304 response skips the download.
+
     Args:
         path: URL path from manifest (may be legacy format like /en/docs/claude-code/hooks)
         session: Requests session
         base_url: Base URL for fetching (DEPRECATED - automatically determined from path)
+        etag: ETag from the previous fetch, sent as If-None-Match
+        last_modified: Last-Modified from the previous fetch, sent as If-Modified-Since
+        limiter: Shared rate limiter; acquired before every attempt, and deferred
+            by Retry-After on a 429 so all workers back off
 
     Returns:
-        Tuple of (filename, content) where filename uses legacy naming convention
+        Tuple of (filename, content, validators) where filename uses legacy naming
+        convention, content is the raw response body (None if the server reported
+        304 Not Modified), and validators holds the response's 'etag'/'last_modified' values
     """
     # Determine the correct base URL based on the path
     # This overrides the passed base_url parameter to handle the multi-domain setup
@@ -112,46 +177,76 @@ def fetch_markdown_content(path: str, session: requests.Session, base_url: str)
     # This ensures files keep their existing names even as URLs change
     filename = url_to_safe_filename(path)
 
-    logger.info(f"Fetching: {markdown_url} -> {filename}")
+    # Conditional request headers (only when we have validators from a previous fetch)
+    headers = dict(HEADERS)
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+
+    logger.info("Fetching: %s -> %s", markdown_url, filename)
 
     for attempt in range(MAX_RETRIES):
+        if limiter is not None:
+            limiter.acquire()
         try:
-            response = session.get(markdown_url, headers=HEADERS, timeout=30, allow_redirects=True)
-
-            # Handle specific HTTP errors
-            if response.status_code == 429:  # Rate limited
-                wait_time = int(response.headers.get('Retry-After', 60))
-                logger.warning(f"Rate limited. Waiting {wait_time} seconds...")
-                time.sleep(wait_time)
-                continue
-
-            response.raise_for_status()
-
-            # Get content and validate
-            content = response.text
-            validate_markdown_content(content, filename)
-
-            logger.info(f"Successfully fetched and validated {filename} ({len(content)} bytes)")
-            return filename, content
+            response = session.get(
+                markdown_url, headers=headers, timeout=30, allow_redirects=True, stream=True
+            )
+            try:
+                # Handle specific HTTP errors
+                if response.status_code == 429:  # Rate limited
+                    wait_time = int(response.headers.get('Retry-After', 60))
+                    logger.warning("Rate limited. Waiting %s seconds...", wait_time)
+                    if limiter is not None:
+                        # Pause every worker, not just this one
+                        limiter.defer(wait_time)
+                    else:
+                        time.sleep(wait_time)
+                    continue
+
+                # Unchanged since the previous fetch - no body to download or validate
+                if response.status_code == 304:
+                    logger.info("Not modified: %s", filename)
+                    # A 304 may omit validators; keep the ones we already have
+                    validators = _response_validators(response)
+                    if etag:
+                        validators.setdefault('etag', etag)
+                    if last_modified:
+                        validators.setdefault('last_modified', last_modified)
+                    return filename, None, validators
+
+                response.raise_for_status()
+
+                # Keep the raw bytes for hashing/saving; decode only to validate
+                content = _read_body(response)
+                validate_markdown_content(
+                    content.decode(response.encoding or 'utf-8', errors='replace'), filename
+                )
+            finally:
+                response.close()
+
+            logger.info("Successfully fetched and validated %s (%s bytes)", filename, len(content))
+            return filename, content, _response_validators(response)
 
         except requests.exceptions.RequestException as e:
-            logger.warning(f"Attempt {attempt + 1}/{MAX_RETRIES} failed for {filename}: {e}")
+            logger.warning("Attempt %s/%s failed for %s: %s", attempt + 1, MAX_RETRIES, filename, e)
             if attempt < MAX_RETRIES - 1:
                 # Exponential backoff with jitter
                 delay = min(RETRY_DELAY * (2 ** attempt), MAX_RETRY_DELAY)
                 # Add jitter to prevent thundering herd
                 jittered_delay = delay * random.uniform(0.5, 1.0)
-                logger.info(f"Retrying in {jittered_delay:.1f} seconds...")
+                logger.info("Retrying in %.1f seconds...", jittered_delay)
                 time.sleep(jittered_delay)
             else:
                 raise Exception(f"Failed to fetch {filename} after {MAX_RETRIES} attempts: {e}")
 
         except ValueError as e:
-            logger.error(f"Content validation failed for {filename}: {e}")
+            logger.error("Content validation failed for %s: %s", filename, e)
             raise
 
 
-def fetch_changelog(session: requests.Session) -> Tuple[str, str]:
+def fetch_changelog(session: requests.Session) -> Tuple[str, bytes]:
     """
     Fetch Claude Code changelog from GitHub repository.
 
@@ -159,12 +254,12 @@ def fetch_changelog(session: requests.Session) -> Tuple[str, str]:
         session: Requests session
 
     Returns:
-        Tuple of (filename, content)
+        Tuple of (filename, content) where content is the UTF-8 encoded changelog
     """
     changelog_url = "https://raw.githubusercontent.com/anthropics/claude-code/main/CHANGELOG.md"
     filename = "changelog.md"
 
-    logger.info(f"Fetching Claude Code changelog: {changelog_url}")
+    logger.info("Fetching Claude Code changelog: %s", changelog_url)
 
     for attempt in range(MAX_RETRIES):
         try:
@@ -172,16 +267,16 @@ def fetch_changelog(session: requests.Session) -> Tuple[str, str]:
 
             if response.status_code == 429:  # Rate limited
                 wait_time = int(response.headers.get('Retry-After', 60))
-                logger.warning(f"Rate limited. Waiting {wait_time} seconds...")
+                logger.warning("Rate limited. Waiting %s seconds...", wait_time)
                 time.sleep(wait_time)
                 continue
 
             response.raise_for_status()
 
-            content = response.text
+            content = response.content
 
             # Add header to indicate this is from Claude Code repo, not docs site
-            header = """# Claude Code Changelog
+            header = b"""# Claude Code Changelog
 
 > **Source**: https://github.com/anthropics/claude-code/blob/main/CHANGELOG.md
 >
@@ -196,58 +291,104 @@ def fetch_changelog(session: requests.Session) -> Tuple[str, str]:
             if len(content.strip()) < 100:
                 raise ValueError(f"Changelog content too short ({len(content)} bytes)")
 
-            logger.info(f"Successfully fetched changelog ({len(content)} bytes)")
+            logger.info("Successfully fetched changelog (%s bytes)", len(content))
             return filename, content
 
         except requests.exceptions.RequestException as e:
-            logger.warning(f"Attempt {attempt + 1}/{MAX_RETRIES} failed for changelog: {e}")
+            logger.warning("Attempt %s/%s failed for changelog: %s", attempt + 1, MAX_RETRIES, e)
             if attempt < MAX_RETRIES - 1:
                 delay = min(RETRY_DELAY * (2 ** attempt), MAX_RETRY_DELAY)
                 jittered_delay = delay * random.uniform(0.5, 1.0)
-                logger.info(f"Retrying in {jittered_delay:.1f} seconds...")
+                logger.info("Retrying in %.1f seconds...", jittered_delay)
                 time.sleep(jittered_delay)
             else:
                 raise Exception(f"Failed to fetch changelog after {MAX_RETRIES} attempts: {e}")
 
         except ValueError as e:
-            logger.error(f"Changelog validation failed: {e}")
+            logger.error("Changelog validation failed: %s", e)
             raise
 
 
-def save_markdown_file(docs_dir: Path, filename: str, content: str) -> str:
+def compute_content_hash(content: Union[str, bytes], algo: Optional[str] = None) -> str:
+    """
+    Compute the hash stored in the manifest for a piece of content.
+
+    Args:
+        content: Content as text (hashed as UTF-8) or raw bytes
+        algo: Hash algorithm to use (defaults to HASH_ALGO)
+
+    Returns:
+        Hex digest of the content
+
+    Raises:
+        ValueError: If the algorithm is not supported
+    """
+    algo = algo or HASH_ALGO
+    if algo not in (HASH_ALGO, LEGACY_HASH_ALGO):
+        raise ValueError(f"Unsupported hash algorithm: {algo}")
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    if algo == HASH_ALGO:
+        return xxhash.xxh3_64_hexdigest(content)
+    return hashlib.sha256(content).hexdigest()
+
+
+def save_markdown_file(
+    docs_dir: Path,
+    filename: str,
+    content: Union[str, bytes],
+    content_hash: Optional[str] = None,
+) -> str:
     """
     Save markdown content and return its hash.
 
+    The content is written to a temporary file that then replaces the
+    target, so an interrupted run never leaves a truncated page behind.
+
     Args:
         docs_dir: Directory to save the file in
         filename: Name of the file
-        content: Content to write
+        content: Content to write (text is written as UTF-8)
+        content_hash: Precomputed hash of content, if already known
 
     Returns:
-        SHA256 hash of the content
+        Hash of the content
     """
     file_path = docs_dir / filename
 
     try:
-        file_path.write_text(content, encoding='utf-8')
-        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
-        logger.info(f"Saved: {filename}")
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        tmp_path = file_path.with_name(filename + '.tmp')
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, file_path)
+        if content_hash is None:
+            content_hash = compute_content_hash(content)
+        logger.info("Saved: %s", filename)
         return content_hash
     except Exception as e:
-        logger.error(f"Failed to save {filename}: {e}")
+        logger.error("Failed to save %s: %s", filename, e)
         raise
 
 
-def content_has_changed(content: str, old_hash: str) -> bool:
+def content_has_changed(
+    content: Union[str, bytes],
+    old_hash: str,
+    algo: Optional[str] = None,
+) -> bool:
     """
     Check if content has changed based on hash.
 
     Args:
-        content: New content to check
+        content: New content to check (text or raw bytes)
         old_hash: Previous content hash
+        algo: Algorithm old_hash was computed with (defaults to HASH_ALGO)
 
     Returns:
-        True if content has changed, False otherwise
+        True if content has changed (or old_hash uses an unknown algorithm),
+        False otherwise
     """
-    new_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
-    return new_hash != old_hash
+    algo = algo or HASH_ALGO
+    if algo not in (HASH_ALGO, LEGACY_HASH_ALGO):
+        return True
+    return compute_content_hash(content, algo) != old_hash
@@ -0,0 +1,68 @@
+"""
+JSON serialization helpers for manifest files.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise. Both paths produce byte-identical output (2-space indent,
+optionally sorted keys, UTF-8). Serialized documents are written with
+write_atomic() so readers never see a partially written file.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional speedup - see requirements.txt
+    orjson = None
+
+
+def loads(data: bytes) -> Any:
+    """
+    Parse JSON from raw file bytes.
+
+    Args:
+        data: UTF-8 encoded JSON document
+
+    Returns:
+        Parsed Python object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, sort_keys: bool = True) -> bytes:
+    """
+    Serialize an object to indented JSON bytes.
+
+    Args:
+        obj: JSON-serializable object
+        sort_keys: Sort object keys; otherwise insertion order is kept
+
+    Returns:
+        UTF-8 encoded JSON document
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2, sort_keys=sort_keys, ensure_ascii=False).encode('utf-8')
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """
+    Write a file atomically via a temporary sibling and os.replace().
+
+    The whole buffer goes out in a single write, and readers (or a crash
+    mid-write) never observe a partially written file.
+
+    Args:
+        path: Destination file
+        data: Complete file contents
+    """
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
@@ -5,16 +5,28 @@ This module handles loading, saving, and validating the docs_manifest.json
 file that tracks all fetched documentation files.
 """
 
-import json
+import configparser
 import os
 import re
 import subprocess
 from datetime import datetime
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
+from . import jsonio
 from .config import MANIFEST_FILE, logger
 
+# Repository git config, read directly by _get_origin_url
+_GIT_CONFIG = Path(__file__).parent.parent.parent / '.git' / 'config'
+
+# Top-level keys that change on every run; differences in these alone
+# don't justify rewriting (and re-committing) the manifest
+VOLATILE_MANIFEST_KEYS = frozenset({"last_updated", "fetch_metadata"})
+
+# Allowed formats for GitHub repository (owner/repo) and ref names
+_REPO_RE = re.compile(r'^[\w.-]+/[\w.-]+$')
+_REF_RE = re.compile(r'^[\w.-]+$')
+
 
 def load_manifest(docs_dir: Path) -> Dict:
     """
@@ -29,20 +41,72 @@ def load_manifest(docs_dir: Path) -> Dict:
     manifest_path = docs_dir / MANIFEST_FILE
     if manifest_path.exists():
         try:
-            manifest = json.loads(manifest_path.read_text())
+            manifest = jsonio.loads(manifest_path.read_bytes())
             # Ensure required keys exist
             if "files" not in manifest:
                 manifest["files"] = {}
             return manifest
         except Exception as e:
-            logger.warning(f"Failed to load manifest: {e}")
+            logger.warning("Failed to load manifest: %s", e)
     return {"files": {}, "last_updated": None}
 
 
+def _material_content(manifest: Dict) -> Dict:
+    """Return the manifest without its volatile (per-run) keys."""
+    return {k: v for k, v in manifest.items() if k not in VOLATILE_MANIFEST_KEYS}
+
+
+def _manifest_unchanged(manifest_path: Path, manifest: Dict) -> bool:
+    """
+    Check whether the manifest on disk already has the same material content.
+
+    Args:
+        manifest_path: Path to the existing manifest file
+        manifest: Manifest about to be written
+
+    Returns:
+        True if only volatile keys differ, False otherwise (or if unreadable)
+    """
+    try:
+        existing = jsonio.loads(manifest_path.read_bytes())
+    except (OSError, ValueError):
+        return False
+    return isinstance(existing, dict) and _material_content(existing) == _material_content(manifest)
+
+
+def checkpoint_manifest(docs_dir: Path, manifest: Dict, fetched_files: Dict) -> None:
+    """
+    Persist fetch progress so an interrupted run can resume cheaply.
+
+    Entries fetched so far are merged over the previous manifest, so files
+    not yet reached keep their old hashes and the next run can still skip
+    them if unchanged.
+
+    Args:
+        docs_dir: Path to the docs directory
+        manifest: Manifest loaded at the start of the run
+        fetched_files: Manifest entries produced so far in this run
+    """
+    manifest_path = docs_dir / MANIFEST_FILE
+    checkpoint = dict(manifest)
+    checkpoint["files"] = {**manifest.get("files", {}), **fetched_files}
+
+    if _manifest_unchanged(manifest_path, checkpoint):
+        return
+
+    jsonio.write_atomic(manifest_path, jsonio.dumps(checkpoint))
+    logger.info("Checkpointed manifest (%s files fetched so far)", len(fetched_files))
+
+
 def save_manifest(docs_dir: Path, manifest: Dict) -> None:
     """
     Save the manifest of fetched files.
 
+    The write is skipped when nothing but the timestamp and fetch
+    metadata changed, so no-op runs leave the file (and git) untouched.
+    Otherwise the file is replaced atomically, so an interrupted run
+    never leaves a truncated manifest.
+
     Args:
         docs_dir: Path to the docs directory
         manifest: Manifest dictionary to save
@@ -55,43 +119,74 @@ def save_manifest(docs_dir: Path, manifest: Dict) -> None:
     github_ref = os.environ.get('GITHUB_REF_NAME', 'main')
 
     # Validate repository name format (owner/repo)
-    if not re.match(r'^[\w.-]+/[\w.-]+$', github_repo):
-        logger.warning(f"Invalid repository format: {github_repo}, using default")
+    if not _REPO_RE.match(github_repo):
+        logger.warning("Invalid repository format: %s, using default", github_repo)
         github_repo = 'seanGSISG/claude-code-docs'
 
     # Validate branch/ref name
-    if not re.match(r'^[\w.-]+$', github_ref):
-        logger.warning(f"Invalid ref format: {github_ref}, using default")
+    if not _REF_RE.match(github_ref):
+        logger.warning("Invalid ref format: %s, using default", github_ref)
         github_ref = 'main'
 
     manifest["base_url"] = f"https://raw.githubusercontent.com/{github_repo}/{github_ref}/docs/"
     manifest["github_repository"] = github_repo
     manifest["github_ref"] = github_ref
     manifest["description"] = "Claude Code documentation manifest. Keys are filenames, append to base_url for full URL."
-    manifest_path.write_text(json.dumps(manifest, indent=2))
+
+    if _manifest_unchanged(manifest_path, manifest):
+        logger.info("Manifest content unchanged, skipping write")
+        return
+
+    jsonio.write_atomic(manifest_path, jsonio.dumps(manifest))
+
+
+def _get_origin_url() -> Optional[str]:
+    """
+    Get the URL of the 'origin' remote.
+
+    Reads .git/config directly to avoid spawning a git process, falling
+    back to `git remote get-url origin` when the config can't be parsed
+    (e.g. worktrees, where .git is a file).
+
+    Returns:
+        Remote URL, or None if it couldn't be determined
+    """
+    try:
+        parser = configparser.ConfigParser(strict=False, interpolation=None)
+        if parser.read(_GIT_CONFIG, encoding='utf-8'):
+            return parser.get('remote "origin"', 'url')
+    except (configparser.Error, UnicodeDecodeError):
+        pass
+
+    result = subprocess.run(
+        ['git', 'remote', 'get-url', 'origin'],
+        capture_output=True,
+        text=True,
+        timeout=5
+    )
+    if result.returncode == 0:
+        return result.stdout.strip()
+    return None
 
 
 def validate_repository_config(manifest: Dict) -> None:
     """
     Validate that manifest repository matches actual git repository.
 
-    Warns if there's a mismatch to catch configuration issues.
+    Warns if there's a mismatch to catch configuration issues. Skipped on
+    GitHub Actions, where GITHUB_REPOSITORY already names the checkout.
 
     Args:
         manifest: Manifest dictionary to validate
     """
+    if os.environ.get('GITHUB_ACTIONS') == 'true' and os.environ.get('GITHUB_REPOSITORY'):
+        return
+
     try:
         # Get actual git repository from remote origin
-        result = subprocess.run(
-            ['git', 'remote', 'get-url', 'origin'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-
-        if result.returncode == 0:
-            git_url = result.stdout.strip()
+        git_url = _get_origin_url()
 
+        if git_url:
             # Extract owner/repo from git URL
             # Handles both HTTPS and SSH formats:
             # - https://github.com/seanGSISG/claude-code-docs.git
@@ -111,12 +206,12 @@ def validate_repository_config(manifest: Dict) -> None:
                 if manifest_repo and repo_part != manifest_repo:
                     logger.warning("=" * 70)
                     logger.warning("⚠️  REPOSITORY MISMATCH DETECTED!")
-                    logger.warning(f"   Git repository: {repo_part}")
-                    logger.warning(f"   Manifest repository: {manifest_repo}")
+                    logger.warning("   Git repository: %s", repo_part)
+                    logger.warning("   Manifest repository: %s", manifest_repo)
                     logger.warning("   This may cause documentation to be fetched from wrong source.")
                     logger.warning("   Consider updating GITHUB_REPOSITORY environment variable or")
                     logger.warning("   updating the default in this script.")
                     logger.warning("=" * 70)
     except Exception as e:
         # Don't fail on validation errors - this is just a warning
-        logger.debug(f"Could not validate repository config: {e}")
+        logger.debug("Could not validate repository config: %s", e)
@@ -8,18 +8,51 @@ This module handles:
 - Determining correct base URLs for paths
 """
 
-import json
+import os
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import List
 
+from . import jsonio
 from .config import logger
 
 
 # Categories that must always be present in the manifest, even if temporarily empty
 REQUIRED_CATEGORIES = ['core_documentation', 'api_reference', 'claude_code']
 
-
+# Claude Code CLI page names hosted on code.claude.com (from its sitemap)
+CLAUDE_CODE_CLI_PAGES = frozenset({
+    'amazon-bedrock', 'analytics', 'checkpointing', 'claude-code-on-the-web',
+    'cli-reference', 'common-workflows', 'costs', 'data-usage', 'desktop',
+    'devcontainer', 'github-actions', 'gitlab-ci-cd', 'google-vertex-ai',
+    'headless', 'hooks', 'hooks-guide', 'iam', 'interactive-mode', 'jetbrains',
+    'legal-and-compliance', 'llm-gateway', 'mcp', 'memory', 'microsoft-foundry',
+    'model-config', 'monitoring-usage', 'network-config', 'output-styles',
+    'overview', 'plugin-marketplaces', 'plugins', 'plugins-reference',
+    'quickstart', 'sandboxing', 'security', 'settings', 'setup', 'skills',
+    'slash-commands', 'statusline', 'sub-agents', 'terminal-config',
+    'third-party-integrations', 'troubleshooting', 'vs-code',
+    # Nested path
+    'sdk/migration-guide',
+})
+
+# Normalized (/en/...) paths categorized as claude_code, and prefixes for their sub-pages
+_CLAUDE_CODE_CATEGORY_PATHS = frozenset(f'/en/{page}' for page in CLAUDE_CODE_CLI_PAGES)
+_CLAUDE_CODE_CATEGORY_PREFIXES = tuple(f'{path}/' for path in sorted(_CLAUDE_CODE_CATEGORY_PATHS))
+
+# Core documentation prefixes, and the same paths without a trailing slash
+_CORE_PREFIXES = (
+    '/en/about-claude/', '/en/build-with-claude/', '/en/agents-and-tools/',
+    '/en/test-and-evaluate/', '/en/get-started', '/en/intro', '/en/mcp',
+)
+_CORE_PATHS = frozenset(prefix.rstrip('/') for prefix in _CORE_PREFIXES)
+
+# ASCII bytes stripped from filenames: everything except letters, digits and "-_."
+_FILENAME_DROP = bytes(b for b in range(128) if not (chr(b).isalnum() or chr(b) in '-_.'))
+
+
+@lru_cache(maxsize=4096)
 def url_to_safe_filename(url_path: str, source_domain: str = None) -> str:
     """
     Convert a URL path to a safe filename with domain-based naming convention.
@@ -35,6 +68,9 @@ def url_to_safe_filename(url_path: str, source_domain: str = None) -> str:
         /docs/en/api/messages (platform.claude.com) → docs__en__api__messages.md
         /docs/en/about-claude/pricing (platform.claude.com) → docs__en__about-claude__pricing.md
 
+    Results are memoized since the same sitemap paths are converted several
+    times per run. Invalid paths are not cached and raise on every call.
+
     Args:
         url_path: URL path like '/docs/en/hooks'
         source_domain: Source domain ('code.claude.com' or 'platform.claude.com')
@@ -71,7 +107,12 @@ def url_to_safe_filename(url_path: str, source_domain: str = None) -> str:
 
     # Sanitize: only keep alphanumeric, hyphens, underscores, and dots
     # This prevents path traversal and injection attacks
-    sanitized = ''.join(c for c in safe_name if c.isalnum() or c in '-_.')
+    if safe_name.isascii():
+        # Fast path: a single C-level pass over the bytes
+        sanitized = safe_name.encode('ascii').translate(None, _FILENAME_DROP).decode('ascii')
+    else:
+        # Non-ASCII letters/digits are kept, matching str.isalnum()
+        sanitized = ''.join(c for c in safe_name if c.isalnum() or c in '-_.')
 
     # Validate the result is not empty
     if not sanitized or sanitized == '.md':
@@ -97,33 +138,9 @@ def is_claude_code_cli_page(path: str) -> bool:
     Returns:
         True if this is a Claude Code CLI page
     """
-    # Claude Code CLI pages - these specific page names are hosted on code.claude.com
-    CLAUDE_CODE_CLI_PAGES = {
-        'amazon-bedrock', 'analytics', 'checkpointing', 'claude-code-on-the-web',
-        'cli-reference', 'common-workflows', 'costs', 'data-usage', 'desktop',
-        'devcontainer', 'github-actions', 'gitlab-ci-cd', 'google-vertex-ai',
-        'headless', 'hooks', 'hooks-guide', 'iam', 'interactive-mode', 'jetbrains',
-        'legal-and-compliance', 'llm-gateway', 'mcp', 'memory', 'microsoft-foundry',
-        'model-config', 'monitoring-usage', 'network-config', 'output-styles',
-        'overview', 'plugin-marketplaces', 'plugins', 'plugins-reference',
-        'quickstart', 'sandboxing', 'security', 'settings', 'setup', 'skills',
-        'slash-commands', 'statusline', 'sub-agents', 'terminal-config',
-        'third-party-integrations', 'troubleshooting', 'vs-code',
-    }
-
-    # Also check for SDK migration guide which is a nested path
-    CLAUDE_CODE_CLI_NESTED = {
-        'sdk/migration-guide',
-    }
-
     # Extract page name from path
     # Path format: /docs/en/page-name or /docs/en/subdir/page-name
-    if path.startswith('/docs/en/'):
-        page_part = path[9:]  # len('/docs/en/') = 9
-        if page_part in CLAUDE_CODE_CLI_PAGES or page_part in CLAUDE_CODE_CLI_NESTED:
-            return True
-
-    return False
+    return path.startswith('/docs/en/') and path[9:] in CLAUDE_CODE_CLI_PAGES  # len('/docs/en/') = 9
 
 
 def categorize_path(path: str) -> str:
@@ -146,28 +163,12 @@ def categorize_path(path: str) -> str:
         normalized = path[5:]  # '/docs/en/...' -> '/en/...'
 
     # API Reference: /en/api/* or /en/docs/agent-sdk/*
-    if normalized.startswith('/en/api/') or normalized.startswith('/en/agent-sdk/'):
+    if normalized.startswith(('/en/api/', '/en/agent-sdk/')):
         return 'api_reference'
 
     # Claude Code CLI docs: specific CLI-related pages
     # These are the actual Claude Code CLI documentation pages
-    claude_code_pages = [
-        '/en/amazon-bedrock', '/en/analytics', '/en/checkpointing',
-        '/en/claude-code-on-the-web', '/en/cli-reference', '/en/common-workflows',
-        '/en/costs', '/en/data-usage', '/en/devcontainer', '/en/github-actions',
-        '/en/gitlab-ci-cd', '/en/google-vertex-ai', '/en/headless', '/en/hooks',
-        '/en/hooks-guide', '/en/iam', '/en/interactive-mode', '/en/jetbrains',
-        '/en/legal-and-compliance', '/en/llm-gateway', '/en/mcp', '/en/memory',
-        '/en/microsoft-foundry', '/en/model-config', '/en/monitoring-usage',
-        '/en/network-config', '/en/output-styles', '/en/overview',
-        '/en/plugin-marketplaces', '/en/plugins', '/en/plugins-reference',
-        '/en/quickstart', '/en/sandboxing', '/en/security', '/en/settings',
-        '/en/setup', '/en/skills', '/en/slash-commands', '/en/statusline',
-        '/en/sub-agents', '/en/terminal-config', '/en/third-party-integrations',
-        '/en/troubleshooting', '/en/vs-code', '/en/desktop',
-        '/en/sdk/migration-guide',
-    ]
-    if normalized in claude_code_pages or any(normalized.startswith(p + '/') for p in claude_code_pages):
+    if normalized in _CLAUDE_CODE_CATEGORY_PATHS or normalized.startswith(_CLAUDE_CODE_CATEGORY_PREFIXES):
         return 'claude_code'
 
     # Prompt Library
@@ -183,15 +184,11 @@ def categorize_path(path: str) -> str:
         return 'release_notes'
 
     # Uncategorized
-    if normalized in ['/en/home', '/en/prompt-library']:
+    if normalized in ('/en/home', '/en/prompt-library'):
         return 'uncategorized'
 
     # Core Documentation: about-claude, build-with-claude, agents-and-tools, test-and-evaluate, etc.
-    core_prefixes = [
-        '/en/about-claude/', '/en/build-with-claude/', '/en/agents-and-tools/',
-        '/en/test-and-evaluate/', '/en/get-started', '/en/intro', '/en/mcp',
-    ]
-    if any(normalized.startswith(prefix) or normalized == prefix.rstrip('/') for prefix in core_prefixes):
+    if normalized.startswith(_CORE_PREFIXES) or normalized in _CORE_PATHS:
         return 'core_documentation'
 
     # Default: if it doesn't match anything specific, categorize as core_documentation
@@ -288,21 +285,18 @@ def load_paths_from_manifest() -> List[str]:
             logger.warning(f"paths_manifest.json not found at {manifest_path}")
             return []
 
-        # Get list of existing local files
+        # Get list of existing local files (names without the .md extension)
         local_files = set()
         if docs_dir.exists():
-            for md_file in docs_dir.glob('*.md'):
-                if md_file.name == 'docs_manifest.json':
-                    continue
-                local_files.add(md_file.stem)  # filename without .md extension
+            with os.scandir(docs_dir) as entries:
+                local_files = {entry.name[:-3] for entry in entries if entry.name.endswith('.md')}
 
         if not local_files:
             logger.warning("No local documentation files found")
             return []
 
         # Load manifest to get all paths
-        with open(manifest_path) as f:
-            data = json.load(f)
+        data = jsonio.loads(manifest_path.read_bytes())
 
         # Collect paths that have corresponding local files
         paths_to_update = []
@@ -368,6 +362,6 @@ def update_paths_manifest(paths: List[str], manifest_file: Path = None) -> None:
         "categories": categorized
     }
 
-    # Write to file
-    manifest_file.write_text(json.dumps(manifest, indent=2))
+    # Write to file (category order is kept: required categories first)
+    jsonio.write_atomic(manifest_file, jsonio.dumps(manifest, sort_keys=False))
     logger.info(f"Updated paths_manifest.json with {len(paths)} paths across {len(categorized)} categories")
@@ -0,0 +1,51 @@
+"""
+Request rate limiting shared across fetch worker threads.
+
+This module provides thread-safe deadline-based pacing so that
+concurrent page fetches still respect a global requests-per-second
+budget.
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe pacer guaranteeing a minimum interval between request starts.
+
+    Each call to acquire() reserves the next start slot and sleeps only
+    until that deadline. Time a request spends in flight counts toward the
+    interval, so the delay overlaps network latency instead of adding to it.
+    defer() pushes the next slot back, pausing every caller (e.g. after a 429).
+    """
+
+    def __init__(self, interval: float):
+        """
+        Args:
+            interval: Minimum seconds between request starts (e.g. RATE_LIMIT_DELAY)
+        """
+        self.interval = interval
+        self._next_allowed = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request is allowed to start."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_allowed)
+            self._next_allowed = start + self.interval
+
+        wait = start - now
+        if wait > 0:
+            time.sleep(wait)
+
+    def defer(self, seconds: float) -> None:
+        """
+        Hold back all request starts for at least the given time from now.
+
+        Args:
+            seconds: Delay before the next request may start (e.g. Retry-After)
+        """
+        with self._lock:
+            self._next_allowed = max(self._next_allowed, time.monotonic() + seconds)
@@ -7,7 +7,7 @@ of documentation files when sitemap discovery fails.
 
 import sys
 from pathlib import Path
-from typing import List, Set
+from typing import List, Optional, Set
 
 from .config import (
     MANIFEST_FILE,
@@ -19,7 +19,12 @@ from .config import (
 from .paths import load_paths_from_manifest
 
 
-def cleanup_old_files(docs_dir: Path, current_files: Set[str], manifest: dict) -> None:
+def cleanup_old_files(
+    docs_dir: Path,
+    current_files: Set[str],
+    manifest: dict,
+    existing_files: Optional[Set[str]] = None,
+) -> None:
     """
     Remove only files that were previously fetched but no longer exist.
 
@@ -33,6 +38,8 @@ def cleanup_old_files(docs_dir: Path, current_files: Set[str], manifest: dict) -
         docs_dir: Path to the docs directory
         current_files: Set of filenames that should be kept
         manifest: Previous manifest with file tracking
+        existing_files: Filenames currently in docs_dir, if already listed;
+            obsolete files missing from it are skipped without touching disk
     """
     previous_files = set(manifest.get("files", {}).keys())
     files_to_remove = previous_files - current_files
@@ -66,14 +73,17 @@ def cleanup_old_files(docs_dir: Path, current_files: Set[str], manifest: dict) -
     if files_to_remove:
         logger.info(f"Removing {len(files_to_remove)} obsolete files (within safe threshold)")
 
+    files_to_remove.discard(MANIFEST_FILE)  # Never delete the manifest
+    if existing_files is not None:
+        files_to_remove &= existing_files
+
+    # unlink() doubles as the existence check (one syscall per file)
     for filename in files_to_remove:
-        if filename == MANIFEST_FILE:  # Never delete the manifest
+        try:
+            (docs_dir / filename).unlink()
+        except FileNotFoundError:
             continue
-
-        file_path = docs_dir / filename
-        if file_path.exists():
-            logger.info(f"Removing obsolete file: {filename}")
-            file_path.unlink()
+        logger.info(f"Removed obsolete file: {filename}")
 
 
 def validate_discovery_threshold(documentation_pages: List[str]) -> List[str]:
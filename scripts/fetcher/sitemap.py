@@ -3,25 +3,113 @@ Sitemap discovery and parsing functionality.
 
 This module handles:
 - Discovering sitemaps from multiple URLs
-- Parsing XML sitemaps safely (XXE prevention)
+- Streaming URLs out of XML sitemaps
 - Extracting English documentation paths
+- Caching discovered paths between runs (revalidated via ETag/Last-Modified)
 """
 
+import io
+import re
 import xml.etree.ElementTree as ET
-from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
 from urllib.parse import urlparse
 
 import requests
 
-from .config import SITEMAP_URLS, HEADERS, logger
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # optional speedup - see requirements.txt
+    lxml_etree = None
 
+from . import jsonio
+from .config import SITEMAP_CACHE_FILE, SITEMAP_URLS, HEADERS, logger
 
-def discover_from_all_sitemaps(session: requests.Session) -> List[str]:
+# Sitemap protocol element names (ElementTree "{namespace}tag" form)
+_SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+_URL_TAG = f'{{{_SITEMAP_NS}}}url'
+_LOC_TAG = f'{{{_SITEMAP_NS}}}loc'
+
+# Documentation paths to skip: example pages and legacy documentation
+_EXCLUDE_RE = re.compile(r'/(?:examples|legacy)/')
+
+
+def load_sitemap_cache(docs_dir: Path) -> Dict:
+    """
+    Load cached sitemap validators and discovered paths.
+
+    Args:
+        docs_dir: Path to the docs directory
+
+    Returns:
+        Cache dictionary mapping sitemap URL to its entry (empty if missing or unreadable)
+    """
+    cache_path = docs_dir / SITEMAP_CACHE_FILE
+    if cache_path.exists():
+        try:
+            cache = jsonio.loads(cache_path.read_bytes())
+            if isinstance(cache, dict):
+                return cache
+        except Exception as e:
+            logger.warning(f"Failed to load sitemap cache: {e}")
+    return {}
+
+
+def save_sitemap_cache(docs_dir: Path, cache: Dict) -> None:
+    """
+    Save sitemap validators and discovered paths for the next run.
+
+    Args:
+        docs_dir: Path to the docs directory
+        cache: Cache dictionary mapping sitemap URL to its entry
+    """
+    cache_path = docs_dir / SITEMAP_CACHE_FILE
+
+    # Every sitemap answered 304 - leave the file (and its mtime) alone
+    try:
+        if jsonio.loads(cache_path.read_bytes()) == cache:
+            return
+    except (OSError, ValueError):
+        pass
+
+    jsonio.write_atomic(cache_path, jsonio.dumps(cache))
+
+
+def _conditional_headers(cached: Optional[Dict]) -> Dict[str, str]:
+    """
+    Build request headers, revalidating a cached sitemap entry if there is one.
+
+    Args:
+        cached: Cache entry for the sitemap, or None
+
+    Returns:
+        HEADERS plus If-None-Match/If-Modified-Since from the entry's validators
+    """
+    headers = dict(HEADERS)
+    if cached and cached.get("pages"):
+        if cached.get("etag"):
+            headers['If-None-Match'] = cached["etag"]
+        if cached.get("last_modified"):
+            headers['If-Modified-Since'] = cached["last_modified"]
+    return headers
+
+
+def _base_url(url: str) -> str:
+    """Return the scheme://netloc part of a URL."""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def discover_from_all_sitemaps(session: requests.Session, cache: Optional[Dict] = None) -> List[str]:
     """
     Discover documentation paths from ALL sitemaps and combine results.
 
+    The sitemaps live on different hosts, so they are fetched concurrently.
+
     Args:
         session: Requests session for connection pooling
+        cache: Optional sitemap cache (see discover_claude_code_pages), updated in place
 
     Returns:
         List of unique English documentation paths discovered from all sitemaps
@@ -32,10 +120,15 @@ def discover_from_all_sitemaps(session: requests.Session) -> List[str]:
     all_paths = []
     successful_sitemaps = 0
 
-    for sitemap_url in SITEMAP_URLS:
-        try:
+    with ThreadPoolExecutor(max_workers=len(SITEMAP_URLS)) as executor:
+        futures = []
+        for sitemap_url in SITEMAP_URLS:
             logger.info(f"Discovering from sitemap: {sitemap_url}")
-            paths = discover_claude_code_pages(session, sitemap_url)
+            futures.append(executor.submit(discover_claude_code_pages, session, sitemap_url, cache=cache))
+
+    for sitemap_url, future in zip(SITEMAP_URLS, futures):
+        try:
+            paths = future.result()
             logger.info(f"  Found {len(paths)} paths from {sitemap_url}")
             all_paths.extend(paths)
             successful_sitemaps += 1
@@ -53,12 +146,17 @@ def discover_from_all_sitemaps(session: requests.Session) -> List[str]:
     return unique_paths
 
 
-def discover_sitemap_and_base_url(session: requests.Session) -> Tuple[str, str]:
+def discover_sitemap_and_base_url(session: requests.Session, cache: Optional[Dict] = None) -> Tuple[str, str]:
     """
     Discover the sitemap URL and extract the base URL from it.
 
+    When a cache entry for the sitemap records its base URL, the sitemap is
+    requested conditionally and a 304 Not Modified response reuses that base
+    URL instead of downloading the sitemap.
+
     Args:
         session: Requests session for connection pooling
+        cache: Optional sitemap cache (see discover_claude_code_pages)
 
     Returns:
         Tuple of (sitemap_url, base_url)
@@ -69,31 +167,24 @@ def discover_sitemap_and_base_url(session: requests.Session) -> Tuple[str, str]:
     for sitemap_url in SITEMAP_URLS:
         try:
             logger.info(f"Trying sitemap: {sitemap_url}")
-            response = session.get(sitemap_url, headers=HEADERS, timeout=30)
+            cached = cache.get(sitemap_url) if cache is not None else None
+            headers = _conditional_headers(cached) if cached and cached.get("base_url") else HEADERS
+            conditional = 'If-None-Match' in headers or 'If-Modified-Since' in headers
+            response = session.get(sitemap_url, headers=headers, timeout=30)
+            if conditional and response.status_code == 304:
+                base_url = cached["base_url"]
+                logger.info(f"Sitemap at {sitemap_url} not modified, base URL: {base_url}")
+                return sitemap_url, base_url
             if response.status_code == 200:
-                # Extract base URL from the first URL in sitemap
-                root = _parse_xml_safely(response.content)
-
-                # Try with namespace first
-                namespace = {'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-                first_url = None
-                for url_elem in root.findall('.//ns:url', namespace):
-                    loc_elem = url_elem.find('ns:loc', namespace)
-                    if loc_elem is not None and loc_elem.text:
-                        first_url = loc_elem.text
-                        break
-
-                # If no URLs found, try without namespace
-                if not first_url:
-                    for loc_elem in root.findall('.//loc'):
-                        if loc_elem.text:
-                            first_url = loc_elem.text
-                            break
+                # Extract base URL from the first URL in sitemap (stops parsing there)
+                first_url = next(_iter_sitemap_locs(response.content), None)
 
                 if first_url:
-                    parsed = urlparse(first_url)
-                    base_url = f"{parsed.scheme}://{parsed.netloc}"
+                    base_url = _base_url(first_url)
                     logger.info(f"Found sitemap at {sitemap_url}, base URL: {base_url}")
+                    if cached:
+                        # Entries cached before base URLs were recorded
+                        cached["base_url"] = base_url
                     return sitemap_url, base_url
         except Exception as e:
             logger.warning(f"Failed to fetch {sitemap_url}: {e}")
@@ -102,48 +193,52 @@ def discover_sitemap_and_base_url(session: requests.Session) -> Tuple[str, str]:
     raise Exception("Could not find a valid sitemap")
 
 
-def discover_claude_code_pages(session: requests.Session, sitemap_url: str) -> List[str]:
+def discover_claude_code_pages(
+    session: requests.Session,
+    sitemap_url: str,
+    cache: Optional[Dict] = None,
+) -> List[str]:
     """
     Dynamically discover all Claude Code documentation pages from the sitemap.
 
+    When a cache is given, the sitemap is requested conditionally using the
+    ETag/Last-Modified stored for it, and a 304 Not Modified response returns
+    the cached paths without downloading or parsing the sitemap.
+
     Args:
         session: Requests session for connection pooling
         sitemap_url: URL of the sitemap to parse
+        cache: Optional dictionary mapping sitemap URL to
+            {"etag", "last_modified", "base_url", "pages"}; updated in place
+            after a parse
 
     Returns:
         List of English documentation paths
     """
     logger.info("Discovering documentation pages from sitemap...")
 
+    # Conditional request headers (only when we have cached paths to fall back on)
+    cached = cache.get(sitemap_url) if cache is not None else None
+    headers = _conditional_headers(cached)
+    conditional = 'If-None-Match' in headers or 'If-Modified-Since' in headers
+
     try:
-        response = session.get(sitemap_url, headers=HEADERS, timeout=30)
+        response = session.get(sitemap_url, headers=headers, timeout=30)
+        if conditional and response.status_code == 304:
+            logger.info(f"Sitemap not modified, reusing {len(cached['pages'])} cached pages")
+            return list(cached["pages"])
         response.raise_for_status()
 
-        # Parse XML sitemap safely
-        root = _parse_xml_safely(response.content)
-
-        # Extract all URLs from sitemap
-        urls = []
-
-        # Try with namespace first
-        namespace = {'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-        for url_elem in root.findall('.//ns:url', namespace):
-            loc_elem = url_elem.find('ns:loc', namespace)
-            if loc_elem is not None and loc_elem.text:
-                urls.append(loc_elem.text)
-
-        # If no URLs found, try without namespace
-        if not urls:
-            for loc_elem in root.findall('.//loc'):
-                if loc_elem.text:
-                    urls.append(loc_elem.text)
-
-        logger.info(f"Found {len(urls)} total URLs in sitemap")
-
-        # Filter for ENGLISH documentation pages only
+        # Filter for ENGLISH documentation pages only, streaming URLs out of
+        # the sitemap instead of building the whole tree
         claude_code_pages = []
+        url_count = 0
+        first_url = None
 
-        for url in urls:
+        for url in _iter_sitemap_locs(response.content):
+            url_count += 1
+            if first_url is None:
+                first_url = url
             parsed = urlparse(url)
             path = parsed.path
 
@@ -155,22 +250,33 @@ def discover_claude_code_pages(session: requests.Session, sitemap_url: str) -> L
 
             # ONLY accept paths that start with /en/ or /docs/en/
             # This excludes /de/, /fr/, /ja/, etc. (other languages)
-            if path.startswith('/en/') or path.startswith('/docs/en/'):
-                # Skip certain types of pages
-                skip_patterns = [
-                    '/examples/',  # Example pages
-                    '/legacy/',    # Legacy documentation
-                ]
-
-                if not any(skip in path for skip in skip_patterns):
+            if path.startswith(('/en/', '/docs/en/')):
+                # Skip certain types of pages (see _EXCLUDE_RE)
+                if not _EXCLUDE_RE.search(path):
                     # Keep original path - normalization happens during fetch
                     claude_code_pages.append(path)
 
+        logger.info(f"Found {url_count} total URLs in sitemap")
+
         # Remove duplicates and sort
         claude_code_pages = sorted(list(set(claude_code_pages)))
 
         logger.info(f"Discovered {len(claude_code_pages)} Claude Code documentation pages")
 
+        # Remember the paths only if the server gave us a way to revalidate them
+        if cache is not None:
+            entry = {}
+            if response.headers.get('ETag'):
+                entry["etag"] = response.headers['ETag']
+            if response.headers.get('Last-Modified'):
+                entry["last_modified"] = response.headers['Last-Modified']
+            if entry and claude_code_pages:
+                entry["base_url"] = _base_url(first_url)
+                entry["pages"] = claude_code_pages
+                cache[sitemap_url] = entry
+            else:
+                cache.pop(sitemap_url, None)
+
         return claude_code_pages
 
     except Exception as e:
@@ -197,21 +303,52 @@ def discover_claude_code_pages(session: requests.Session, sitemap_url: str) -> L
         ]
 
 
-def _parse_xml_safely(content: bytes) -> ET.Element:
+def _iter_sitemap_locs(content: bytes) -> Iterator[str]:
     """
-    Parse XML content safely to prevent XXE attacks.
+    Stream page URLs out of a sitemap.
+
+    Yields the text of each <loc> inside a namespaced <url> element, or of
+    any un-namespaced <loc>. Elements are discarded as soon as they have
+    been read, so memory use does not grow with the number of URLs.
+
+    Parsing uses lxml (libxml2) when it is installed, with entity
+    resolution and network access disabled, and the stdlib expat parser
+    otherwise.
 
     Args:
         content: Raw XML content bytes
 
-    Returns:
-        Parsed XML root element
+    Yields:
+        URLs in document order
     """
-    try:
-        # Try with security parameters (Python 3.8+)
-        parser = ET.XMLParser(forbid_dtd=True, forbid_entities=True, forbid_external=True)
-        return ET.fromstring(content, parser=parser)
-    except TypeError:
-        # Fallback for older Python versions
-        logger.warning("XMLParser security parameters not available, using default parser")
-        return ET.fromstring(content)
+    root = None
+    depth = 0
+    in_url = False
+
+    source = io.BytesIO(content)
+    if lxml_etree is not None:
+        events = lxml_etree.iterparse(
+            source, events=("start", "end"), resolve_entities=False, no_network=True, huge_tree=False
+        )
+    else:
+        events = ET.iterparse(source, events=("start", "end"))
+
+    for event, elem in events:
+        if event == "start":
+            if root is None:
+                root = elem
+            depth += 1
+            if elem.tag == _URL_TAG:
+                in_url = True
+            continue
+
+        depth -= 1
+        if (elem.tag == _LOC_TAG and in_url) or elem.tag == 'loc':
+            if elem.text:
+                yield elem.text
+        elif elem.tag == _URL_TAG:
+            in_url = False
+
+        # A finished child of the root is no longer needed
+        if depth == 1:
+            root.clear()
@@ -1,34 +1,100 @@
 """Unit tests for fetching Claude documentation."""
 
 import pytest
+import hashlib
 import json
+import subprocess
 import sys
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 import tempfile
 import xml.etree.ElementTree as ET
 
+import requests
+
 # Add scripts directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "scripts"))
 
 from fetch_claude_docs import (
     load_manifest,
     save_manifest,
+    checkpoint_manifest,
+    validate_repository_config,
     url_to_safe_filename,
     discover_sitemap_and_base_url,
     discover_claude_code_pages,
+    discover_from_all_sitemaps,
+    load_sitemap_cache,
+    save_sitemap_cache,
     validate_markdown_content,
+    fetch_markdown_content,
+    content_has_changed,
+    compute_content_hash,
+    save_markdown_file,
     get_base_url_for_path,
     convert_legacy_path_to_fetch_url,
+    RateLimiter,
+    cleanup_old_files,
+    HASH_ALGO,
     HEADERS,
-    MANIFEST_FILE
+    MANIFEST_FILE,
+    SITEMAP_URLS
 )
+from fetcher.cli import create_session, main
+from fetcher.config import MAX_WORKERS
+from fetcher.manifest import _get_origin_url
+from fetcher.sitemap import _iter_sitemap_locs
+
+
+# Sitemaps shared by the discovery tests
+SITEMAP_PLATFORM = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+    <url><loc>https://platform.claude.com/en/docs/overview</loc></url>
+</urlset>"""
+
+SITEMAP_CODE = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+    <url><loc>https://code.claude.com/docs/en/overview</loc></url>
+</urlset>"""
+
+SITEMAP_BASIC = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+    <url><loc>https://platform.claude.com/en/docs/claude-code/overview</loc></url>
+    <url><loc>https://platform.claude.com/en/docs/claude-code/setup</loc></url>
+    <url><loc>https://platform.claude.com/en/docs/other/page</loc></url>
+</urlset>"""
+
+SITEMAP_FILTERED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+    <url><loc>https://platform.claude.com/en/docs/claude-code/overview</loc></url>
+    <url><loc>https://platform.claude.com/en/docs/claude-code/tool-use/bash</loc></url>
+    <url><loc>https://platform.claude.com/en/examples/test</loc></url>
+    <url><loc>https://platform.claude.com/en/legacy/old-page</loc></url>
+</urlset>"""
+
+
+@pytest.fixture
+def session():
+    """Mock HTTP session; tests configure session.get's response."""
+    return Mock(spec=requests.Session)
+
+
+def mock_response(content=b"", status=200, headers=None):
+    """Canned response for session.get."""
+    return Mock(status_code=status, content=content, headers=headers or {})
+
+
+@pytest.fixture
+def docs_dir(fs):
+    """Empty docs directory on an in-memory filesystem (pyfakefs)."""
+    fs.create_dir("/docs")
+    return Path("/docs")
 
 
 class TestLoadManifest:
     """Test manifest loading."""
 
-    def test_load_manifest_existing(self, tmp_path):
+    def test_load_manifest_existing(self, docs_dir):
         """Test loading existing manifest."""
         manifest_data = {
             "files": {
@@ -37,8 +103,6 @@ class TestLoadManifest:
             "last_updated": "2024-01-01T00:00:00"
         }
 
-        docs_dir = tmp_path / "docs"
-        docs_dir.mkdir()
         manifest_file = docs_dir / MANIFEST_FILE
         manifest_file.write_text(json.dumps(manifest_data))
 
@@ -47,21 +111,16 @@ class TestLoadManifest:
         assert "files" in manifest
         assert "/en/docs/test" in manifest["files"]
 
-    def test_load_manifest_missing(self, tmp_path):
+    def test_load_manifest_missing(self, docs_dir):
         """Test loading manifest when file doesn't exist."""
-        docs_dir = tmp_path / "docs"
-        docs_dir.mkdir()
-
         manifest = load_manifest(docs_dir)
 
         assert "files" in manifest
         assert manifest["files"] == {}
         assert "last_updated" in manifest
 
-    def test_load_manifest_corrupted(self, tmp_path):
+    def test_load_manifest_corrupted(self, docs_dir):
         """Test loading corrupted manifest."""
-        docs_dir = tmp_path / "docs"
-        docs_dir.mkdir()
         manifest_file = docs_dir / MANIFEST_FILE
         manifest_file.write_text("invalid json {]")
 
@@ -70,10 +129,8 @@ class TestLoadManifest:
         # Should fallback to empty manifest
         assert "files" in manifest
 
-    def test_load_manifest_missing_files_key(self, tmp_path):
+    def test_load_manifest_missing_files_key(self, docs_dir):
         """Test manifest missing 'files' key is fixed."""
-        docs_dir = tmp_path / "docs"
-        docs_dir.mkdir()
         manifest_file = docs_dir / MANIFEST_FILE
         manifest_file.write_text('{"other_key": "value"}')
 
@@ -85,12 +142,14 @@ class TestLoadManifest:
 class TestSaveManifest:
     """Test manifest saving."""
 
-    @patch.dict('os.environ', {}, clear=True)
-    def test_save_manifest_basic(self, tmp_path):
-        """Test basic manifest saving."""
-        docs_dir = tmp_path / "docs"
-        docs_dir.mkdir()
+    @pytest.fixture(autouse=True)
+    def _clean_env(self, monkeypatch):
+        """Run without the GitHub variables save_manifest reads."""
+        for key in ("GITHUB_REPOSITORY", "GITHUB_REF_NAME"):
+            monkeypatch.delenv(key, raising=False)
 
+    def test_save_manifest_basic(self, docs_dir):
+        """Test basic manifest saving."""
         manifest = {
             "files": {
                 "/en/docs/test": {"title": "Test"}
@@ -106,12 +165,20 @@ class TestSaveManifest:
         assert "files" in saved
         assert "last_updated" in saved
 
-    @patch.dict('os.environ', {'GITHUB_REPOSITORY': 'test/repo', 'GITHUB_REF_NAME': 'main'})
-    def test_save_manifest_uses_github_env(self, tmp_path):
-        """Test manifest uses GitHub environment variables."""
-        docs_dir = tmp_path / "docs"
-        docs_dir.mkdir()
+    def test_save_manifest_replaces_atomically(self, docs_dir):
+        """Test the manifest is swapped in whole, leaving no temporary file."""
+        (docs_dir / MANIFEST_FILE).write_text('{"files": {"old.md": {}}}')
+
+        save_manifest(docs_dir, {"files": {"new.md": {}}})
 
+        saved = json.loads((docs_dir / MANIFEST_FILE).read_text())
+        assert list(saved["files"]) == ["new.md"]
+        assert not (docs_dir / (MANIFEST_FILE + ".tmp")).exists()
+
+    def test_save_manifest_uses_github_env(self, docs_dir, monkeypatch):
+        """Test manifest uses GitHub environment variables."""
+        monkeypatch.setenv("GITHUB_REPOSITORY", "test/repo")
+        monkeypatch.setenv("GITHUB_REF_NAME", "main")
         manifest = {"files": {}}
 
         save_manifest(docs_dir, manifest)
@@ -123,12 +190,8 @@ class TestSaveManifest:
         assert saved["github_ref"] == "main"
         assert "test/repo/main" in saved["base_url"]
 
-    @patch.dict('os.environ', {}, clear=True)
-    def test_save_manifest_uses_default_repo(self, tmp_path):
+    def test_save_manifest_uses_default_repo(self, docs_dir):
         """Test manifest uses default repo when env not set."""
-        docs_dir = tmp_path / "docs"
-        docs_dir.mkdir()
-
         manifest = {"files": {}}
 
         save_manifest(docs_dir, manifest)
@@ -138,12 +201,9 @@ class TestSaveManifest:
 
         assert "seanGSISG/claude-code-docs" in saved["base_url"]
 
-    @patch.dict('os.environ', {'GITHUB_REPOSITORY': 'invalid repo name'}, clear=True)
-    def test_save_manifest_validates_repo_format(self, tmp_path):
+    def test_save_manifest_validates_repo_format(self, docs_dir, monkeypatch):
         """Test invalid repo format is sanitized."""
-        docs_dir = tmp_path / "docs"
-        docs_dir.mkdir()
-
+        monkeypatch.setenv("GITHUB_REPOSITORY", "invalid repo name")
         manifest = {"files": {}}
 
         save_manifest(docs_dir, manifest)
@@ -154,11 +214,8 @@ class TestSaveManifest:
         # Should fallback to default
         assert "seanGSISG/claude-code-docs" in saved["base_url"]
 
-    def test_save_manifest_includes_timestamp(self, tmp_path):
+    def test_save_manifest_includes_timestamp(self, docs_dir):
         """Test manifest includes timestamp."""
-        docs_dir = tmp_path / "docs"
-        docs_dir.mkdir()
-
         manifest = {"files": {}}
 
         save_manifest(docs_dir, manifest)
@@ -169,218 +226,189 @@ class TestSaveManifest:
         assert "last_updated" in saved
         assert "T" in saved["last_updated"]  # ISO format
 
+    def test_save_manifest_skips_unchanged_content(self, docs_dir):
+        """Test rewrite is skipped when only volatile keys differ."""
+        manifest_file = docs_dir / MANIFEST_FILE
 
-class TestUrlToSafeFilename:
-    """Test URL to safe filename conversion."""
-
-    def test_url_to_safe_filename_basic(self):
-        """Test basic filename conversion."""
-        url = "/en/docs/claude-code/overview"
-        result = url_to_safe_filename(url)
-
-        assert result.endswith(".md")
-        assert "/" not in result
-        # Result should be a valid filename
-        assert isinstance(result, str)
-
-    def test_url_to_safe_filename_with_claude_code_prefix(self):
-        """Test removes claude-code prefix."""
-        url = "/en/docs/claude-code/overview"
-        result = url_to_safe_filename(url)
-
-        # Should have converted slashes to double underscores
-        assert isinstance(result, str)
-        assert result.endswith(".md")
-
-    def test_url_to_safe_filename_no_subdirectories(self):
-        """Test simple path without subdirectories."""
-        url = "/en/docs/claude-code/overview"
-        result = url_to_safe_filename(url)
+        save_manifest(docs_dir, {"files": {"a.md": {"hash": "1"}}, "fetch_metadata": {"run": 1}})
+        first = manifest_file.read_bytes()
 
-        assert result.endswith(".md")
-        assert "/" not in result
+        save_manifest(docs_dir, {"files": {"a.md": {"hash": "1"}}, "fetch_metadata": {"run": 2}})
+        assert manifest_file.read_bytes() == first
 
-    def test_url_to_safe_filename_nested_paths(self):
-        """Test nested path conversion."""
-        url = "/en/docs/claude-code/advanced/setup"
-        result = url_to_safe_filename(url)
+        save_manifest(docs_dir, {"files": {"a.md": {"hash": "2"}}, "fetch_metadata": {"run": 3}})
+        saved = json.loads(manifest_file.read_text())
+        assert saved["files"]["a.md"]["hash"] == "2"
+        assert saved["fetch_metadata"]["run"] == 3
+
+
+class TestCheckpointManifest:
+    """Test mid-run manifest checkpoints."""
+
+    def test_checkpoint_merges_over_previous_entries(self, tmp_path):
+        """Test fetched entries replace old ones while unreached files are kept."""
+        previous = {"files": {"a.md": {"hash": "old-a"}, "b.md": {"hash": "old-b"}}}
+
+        checkpoint_manifest(tmp_path, previous, {"a.md": {"hash": "new-a"}})
+
+        saved = json.loads((tmp_path / MANIFEST_FILE).read_text())
+        assert saved["files"]["a.md"]["hash"] == "new-a"
+        assert saved["files"]["b.md"]["hash"] == "old-b"
+        assert previous["files"]["a.md"]["hash"] == "old-a"  # input not mutated
+        assert not list(tmp_path.glob("*.tmp"))
+
+
+class TestValidateRepositoryConfig:
+    """Test repository configuration validation."""
+
+    @pytest.fixture(autouse=True)
+    def _clean_env(self, monkeypatch):
+        """Run as if outside GitHub Actions."""
+        for key in ("GITHUB_ACTIONS", "GITHUB_REPOSITORY"):
+            monkeypatch.delenv(key, raising=False)
+
+    @patch('fetcher.manifest._get_origin_url')
+    def test_skipped_on_github_actions(self, mock_origin, monkeypatch):
+        """Test no git lookup happens when running on GitHub Actions."""
+        monkeypatch.setenv('GITHUB_ACTIONS', 'true')
+        monkeypatch.setenv('GITHUB_REPOSITORY', 'test/repo')
+
+        validate_repository_config({"github_repository": "other/repo"})
+
+        mock_origin.assert_not_called()
+
+    @patch('fetcher.manifest._get_origin_url', return_value='git@github.com:someone/fork.git')
+    def test_warns_on_mismatch(self, mock_origin, caplog):
+        """Test a mismatch between origin and manifest is reported."""
+        validate_repository_config({"github_repository": "seanGSISG/claude-code-docs"})
+
+        assert "REPOSITORY MISMATCH" in caplog.text
+        assert "someone/fork" in caplog.text
+
+
+class TestGetOriginUrl:
+    """Test reading the origin remote from .git/config."""
+
+    @pytest.fixture
+    def git_config(self, tmp_path, monkeypatch):
+        config = tmp_path / "config"
+        monkeypatch.setattr('fetcher.manifest._GIT_CONFIG', config)
+        return config
+
+    @pytest.fixture
+    def git_remote(self):
+        """`git remote get-url origin`, used when .git/config gives no answer."""
+        with patch('fetcher.manifest.subprocess.run') as run:
+            run.return_value = Mock(returncode=0, stdout="https://github.com/from/subprocess.git\n")
+            yield run
+
+    def test_reads_origin_from_config(self, git_config, git_remote):
+        """Test the origin url comes straight from .git/config without running git."""
+        git_config.write_text(
+            '[core]\n\tbare = false\n'
+            '[remote "origin"]\n\turl = git@github.com:seanGSISG/claude-code-docs.git\n'
+            '\tfetch = +refs/heads/*:refs/remotes/origin/*\n'
+        )
+
+        assert _get_origin_url() == "git@github.com:seanGSISG/claude-code-docs.git"
+        git_remote.assert_not_called()
+
+    @pytest.mark.parametrize("contents", [
+        '[core]\n\tbare = false\n[remote "upstream"]\n\turl = https://github.com/x/y.git\n',
+        b'\xff\xfe not a git config',
+        None,
+    ], ids=["no-origin-section", "unreadable", "missing"])
+    def test_falls_back_to_git(self, git_config, git_remote, contents):
+        """Test git is asked when .git/config has no origin or can't be read."""
+        if isinstance(contents, str):
+            git_config.write_text(contents)
+        elif contents is not None:
+            git_config.write_bytes(contents)
+
+        assert _get_origin_url() == "https://github.com/from/subprocess.git"
+        assert git_remote.call_args.args[0] == ['git', 'remote', 'get-url', 'origin']
+
+
+# (url, expectations) for url_to_safe_filename. Every valid result must end
+# in a single ".md" and contain no "/"; "forbid" lists characters that must
+# be stripped, "contains" a substring that must survive, and "raises" the
+# expected ValueError message.
+URL_TO_FILENAME_CASES = [
+    ("/en/docs/claude-code/overview", {}),
+    ("/en/docs/claude-code/advanced/setup", {"contains": "__"}),
+    ("/en/docs/claude-code/overview.md", {}),
+    ("/en/docs/claude-code/getting-started", {"contains": "-"}),
+    ("/docs/claude-code/test", {}),
+    ("/claude-code/test", {}),
+    ("/en/docs/test-file_name123", {"contains": "test-file_name123"}),
+    ("/en/docs/café-guide", {"contains": "café-guide"}),  # Non-ASCII letters are kept
+    # Sanitization
+    ("/en/docs/test<script>alert('xss')</script>", {"forbid": "<>()'"}),
+    ("/en/docs/../../../etc/passwd", {}),
+    ("/en/docs/test\x00malicious", {"forbid": "\x00"}),
+    ("/en/docs/test;rm -rf /", {"forbid": "; "}),
+    ("/en/docs/test\u202e\u202d", {"forbid": "\u202e\u202d"}),  # Right-to-left override
+    ("/en/docs/test'; DROP TABLE docs;--", {"forbid": "';", "max_hyphens": 2}),
+    ("/en/docs/test`whoami`", {"forbid": "`"}),
+    ("/en/docs/test<>:\"|?*", {"forbid": '<>:"|?*'}),  # Windows reserved characters
+    # Nothing left after sanitization
+    ("///<<<>>>", {"raises": "empty filename"}),
+    ("/.md", {"raises": "empty filename"}),
+]
+
+
+@pytest.mark.parallel_safe
+class TestUrlToSafeFilename:
+    """Test URL to safe filename conversion."""
 
-        assert result.endswith(".md")
-        assert "__" in result  # Should have double underscores
+    @pytest.mark.parametrize("url, checks", URL_TO_FILENAME_CASES)
+    def test_url_to_safe_filename(self, url, checks):
+        """Test conversion and sanitization of a documentation path."""
+        if "raises" in checks:
+            with pytest.raises(ValueError, match=checks["raises"]):
+                url_to_safe_filename(url)
+            return
 
-    def test_url_to_safe_filename_already_has_extension(self):
-        """Test doesn't double .md extension."""
-        url = "/en/docs/claude-code/overview.md"
         result = url_to_safe_filename(url)
 
         assert result.endswith(".md")
         assert result.count(".md") == 1
-
-    def test_url_to_safe_filename_preserves_hyphens(self):
-        """Test hyphens are preserved."""
-        url = "/en/docs/claude-code/getting-started"
-        result = url_to_safe_filename(url)
-
-        assert "-" in result or "getting__started" in result
-
-    def test_url_to_safe_filename_different_prefixes(self):
-        """Test handles different claude-code prefix formats."""
-        test_cases = [
-            "/en/docs/claude-code/test",
-            "/docs/claude-code/test",
-            "/claude-code/test"
-        ]
-
-        for url in test_cases:
-            result = url_to_safe_filename(url)
-            assert result.endswith(".md")
-            assert "/" not in result
-
-    def test_url_to_safe_filename_sanitizes_special_characters(self):
-        """Test that special characters are removed."""
-        # Test various special characters that should be removed
-        url = "/en/docs/test<script>alert('xss')</script>"
-        result = url_to_safe_filename(url)
-
-        # Should only contain alphanumeric, hyphens, underscores, dots
-        assert "<" not in result
-        assert ">" not in result
-        assert "(" not in result
-        assert ")" not in result
-        assert "'" not in result
-        assert result.endswith(".md")
-
-    def test_url_to_safe_filename_sanitizes_path_traversal(self):
-        """Test that path traversal attempts are sanitized."""
-        # Try path traversal patterns
-        url = "/en/docs/../../../etc/passwd"
-        result = url_to_safe_filename(url)
-
-        # Should have removed dots in traversal pattern but kept necessary structure
-        assert result.endswith(".md")
-        # After sanitization, should be safe
         assert "/" not in result
+        for char in checks.get("forbid", ""):
+            assert char not in result
+        if "contains" in checks:
+            assert checks["contains"] in result
+        if "max_hyphens" in checks:
+            assert result.count("-") <= checks["max_hyphens"]
 
-    def test_url_to_safe_filename_sanitizes_null_bytes(self):
-        """Test that null bytes are removed."""
-        url = "/en/docs/test\x00malicious"
-        result = url_to_safe_filename(url)
-
-        # Null bytes should be removed
-        assert "\x00" not in result
-        assert result.endswith(".md")
-
-    def test_url_to_safe_filename_sanitizes_shell_metacharacters(self):
-        """Test that shell metacharacters are removed."""
-        url = "/en/docs/test;rm -rf /"
-        result = url_to_safe_filename(url)
-
-        # Shell metacharacters should be removed
-        assert ";" not in result
-        assert " " not in result
-        assert result.endswith(".md")
-
-    def test_url_to_safe_filename_sanitizes_unicode_attacks(self):
-        """Test that problematic unicode is handled."""
-        # Unicode characters that could cause issues
-        url = "/en/docs/test\u202e\u202d"  # Right-to-left override
-        result = url_to_safe_filename(url)
-
-        # Should only contain safe characters
-        assert result.endswith(".md")
-        # Unicode control characters should be removed
-        assert "\u202e" not in result
-        assert "\u202d" not in result
-
-    def test_url_to_safe_filename_empty_after_sanitization(self):
-        """Test that empty result after sanitization raises error."""
-        # URL with only special characters
-        url = "///<<<>>>"
-
-        with pytest.raises(ValueError, match="empty filename"):
-            url_to_safe_filename(url)
-
-    def test_url_to_safe_filename_only_extension(self):
-        """Test that only .md extension raises error."""
-        url = "/.md"
-
-        with pytest.raises(ValueError, match="empty filename"):
-            url_to_safe_filename(url)
-
-    def test_url_to_safe_filename_preserves_valid_characters(self):
-        """Test that valid characters are preserved."""
-        url = "/en/docs/test-file_name123"
-        result = url_to_safe_filename(url)
-
-        # Should preserve alphanumeric, hyphens, underscores
-        assert "test-file_name123" in result or "testfilename123" in result
-        assert result.endswith(".md")
-
-    def test_url_to_safe_filename_sql_injection_attempt(self):
-        """Test SQL injection patterns are sanitized."""
-        url = "/en/docs/test'; DROP TABLE docs;--"
-        result = url_to_safe_filename(url)
-
-        # SQL injection characters should be removed
-        assert "'" not in result
-        assert ";" not in result
-        assert "-" not in result or result.count("-") <= 2  # May keep hyphens in valid parts
-        assert result.endswith(".md")
-
-    def test_url_to_safe_filename_command_injection_attempt(self):
-        """Test command injection patterns are sanitized."""
-        url = "/en/docs/test`whoami`"
-        result = url_to_safe_filename(url)
+    def test_url_to_safe_filename_is_memoized(self):
+        """Test repeated paths are served from the cache and errors still raise."""
+        url_to_safe_filename.cache_clear()
 
-        # Backticks should be removed
-        assert "`" not in result
-        assert result.endswith(".md")
-
-    def test_url_to_safe_filename_windows_reserved_characters(self):
-        """Test Windows reserved characters are removed."""
-        url = "/en/docs/test<>:\"|?*"
-        result = url_to_safe_filename(url)
+        first = url_to_safe_filename("/docs/en/hooks")
+        assert url_to_safe_filename("/docs/en/hooks") == first
+        assert url_to_safe_filename.cache_info().hits == 1
 
-        # Windows reserved characters should be removed
-        for char in '<>:"|?*':
-            assert char not in result
-        assert result.endswith(".md")
+        for _ in range(2):
+            with pytest.raises(ValueError, match="empty filename"):
+                url_to_safe_filename("///")
 
 
 class TestDiscoverSitemapAndBaseUrl:
     """Test sitemap discovery."""
 
-    def test_discover_sitemap_and_base_url_success(self):
+    def test_discover_sitemap_and_base_url_success(self, session):
         """Test successful sitemap discovery."""
-        sitemap_xml = b"""<?xml version="1.0" encoding="UTF-8"?>
-        <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-            <url>
-                <loc>https://platform.claude.com/en/docs/overview</loc>
-            </url>
-        </urlset>"""
-
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.content = sitemap_xml
-
-        session = Mock()
-        session.get.return_value = mock_response
+        session.get.return_value = mock_response(SITEMAP_PLATFORM)
 
         sitemap_url, base_url = discover_sitemap_and_base_url(session)
 
         assert base_url == "https://platform.claude.com"
         assert "sitemap" in sitemap_url.lower()
 
-    def test_discover_sitemap_tries_multiple_urls(self):
+    def test_discover_sitemap_tries_multiple_urls(self, session):
         """Test tries multiple sitemap URLs."""
         # First fails, second succeeds
-        sitemap_xml = b"""<?xml version="1.0" encoding="UTF-8"?>
-        <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-            <url>
-                <loc>https://code.claude.com/docs/en/overview</loc>
-            </url>
-        </urlset>"""
-
         call_count = 0
 
         def side_effect(*args, **kwargs):
@@ -393,10 +421,9 @@ class TestDiscoverSitemapAndBaseUrl:
             else:
                 resp = Mock()
                 resp.status_code = 200
-                resp.content = sitemap_xml
+                resp.content = SITEMAP_CODE
                 return resp
 
-        session = Mock()
         session.get.side_effect = side_effect
 
         try:
@@ -406,33 +433,51 @@ class TestDiscoverSitemapAndBaseUrl:
             # May fail due to mock complexity, but that's ok
             pass
 
-    def test_discover_sitemap_error_handling(self):
+    def test_discover_sitemap_error_handling(self, session):
         """Test error handling when sitemap can't be found."""
-        session = Mock()
         session.get.side_effect = Exception("Network error")
 
         with pytest.raises(Exception):
             discover_sitemap_and_base_url(session)
 
+    def test_discover_sitemap_not_modified_uses_cached_base_url(self, session):
+        """Test a 304 response reuses the cached base URL without parsing."""
+        session.get.return_value = mock_response(status=304)
+        cache = {SITEMAP_URLS[0]: {
+            "etag": '"v1"', "base_url": "https://platform.claude.com", "pages": ["/en/docs/cached"]
+        }}
+
+        sitemap_url, base_url = discover_sitemap_and_base_url(session, cache=cache)
+
+        assert (sitemap_url, base_url) == (SITEMAP_URLS[0], "https://platform.claude.com")
+        assert session.get.call_args.kwargs['headers']['If-None-Match'] == '"v1"'
+
+    def test_all_not_modified_leaves_sitemap_cache_untouched(self, session, tmp_path):
+        """Test a discovery where every sitemap returns 304 doesn't rewrite the cache file."""
+        session.get.return_value = mock_response(SITEMAP_BASIC, headers={'ETag': '"v1"'})
+        cache = load_sitemap_cache(tmp_path)
+        discover_from_all_sitemaps(session, cache=cache)
+        save_sitemap_cache(tmp_path, cache)
+        cache_file = next(tmp_path.iterdir())
+        before = (cache_file.read_bytes(), cache_file.stat().st_mtime_ns)
+        session.get.return_value = mock_response(status=304)
+
+        cache = load_sitemap_cache(tmp_path)
+        discover_sitemap_and_base_url(session, cache=cache)
+        discover_from_all_sitemaps(session, cache=cache)
+        save_sitemap_cache(tmp_path, cache)
+
+        assert all('If-None-Match' in c.kwargs['headers'] for c in session.get.call_args_list[-3:])
+        assert (cache_file.read_bytes(), cache_file.stat().st_mtime_ns) == before
+
 
+@pytest.mark.parallel_safe
 class TestDiscoverClaudeCodePages:
     """Test Claude Code page discovery."""
 
-    def test_discover_claude_code_pages_basic(self):
+    def test_discover_claude_code_pages_basic(self, session):
         """Test basic page discovery - now returns ALL /en/ paths."""
-        sitemap_xml = b"""<?xml version="1.0" encoding="UTF-8"?>
-        <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-            <url><loc>https://platform.claude.com/en/docs/claude-code/overview</loc></url>
-            <url><loc>https://platform.claude.com/en/docs/claude-code/setup</loc></url>
-            <url><loc>https://platform.claude.com/en/docs/other/page</loc></url>
-        </urlset>"""
-
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.content = sitemap_xml
-
-        session = Mock()
-        session.get.return_value = mock_response
+        session.get.return_value = mock_response(SITEMAP_BASIC)
 
         pages = discover_claude_code_pages(session, "https://platform.claude.com/sitemap.xml")
 
@@ -442,22 +487,9 @@ class TestDiscoverClaudeCodePages:
         assert "/en/docs/claude-code/setup" in pages
         assert "/en/docs/other/page" in pages
 
-    def test_discover_claude_code_pages_filters_patterns(self):
+    def test_discover_claude_code_pages_filters_patterns(self, session):
         """Test filters out only /examples/ and /legacy/ patterns."""
-        sitemap_xml = b"""<?xml version="1.0" encoding="UTF-8"?>
-        <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-            <url><loc>https://platform.claude.com/en/docs/claude-code/overview</loc></url>
-            <url><loc>https://platform.claude.com/en/docs/claude-code/tool-use/bash</loc></url>
-            <url><loc>https://platform.claude.com/en/examples/test</loc></url>
-            <url><loc>https://platform.claude.com/en/legacy/old-page</loc></url>
-        </urlset>"""
-
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.content = sitemap_xml
-
-        session = Mock()
-        session.get.return_value = mock_response
+        session.get.return_value = mock_response(SITEMAP_FILTERED)
 
         pages = discover_claude_code_pages(session, "https://platform.claude.com/sitemap.xml")
 
@@ -467,9 +499,8 @@ class TestDiscoverClaudeCodePages:
         assert not any("examples" in p for p in pages)  # examples excluded
         assert not any("legacy" in p for p in pages)  # legacy excluded
 
-    def test_discover_claude_code_pages_error_fallback(self):
+    def test_discover_claude_code_pages_error_fallback(self, session):
         """Test fallback when discovery fails."""
-        session = Mock()
         session.get.side_effect = Exception("Network error")
 
         pages = discover_claude_code_pages(session, "https://platform.claude.com/sitemap.xml")
@@ -479,7 +510,49 @@ class TestDiscoverClaudeCodePages:
         assert all(isinstance(p, str) for p in pages)
         assert all("claude-code" in p for p in pages)
 
+    @pytest.mark.parametrize("use_lxml", [True, False])
+    def test_sitemap_locs_stream_once(self, use_lxml, monkeypatch):
+        """Test URLs are streamed lazily, namespaced or not, with either parser."""
+        if use_lxml:
+            pytest.importorskip("lxml")
+        else:
+            monkeypatch.setattr('fetcher.sitemap.lxml_etree', None)
+
+        locs = _iter_sitemap_locs(SITEMAP_FILTERED)
+
+        assert next(locs) == "https://platform.claude.com/en/docs/claude-code/overview"
+        assert len(list(locs)) == 3
+        assert list(locs) == []  # a generator, consumed once
+        assert list(_iter_sitemap_locs(b"<urlset><url><loc>https://x/en/a</loc></url></urlset>")) == [
+            "https://x/en/a"
+        ]
+
+    def test_discover_populates_cache(self, session):
+        """Test parsed paths are cached with the sitemap's validators."""
+        session.get.return_value = mock_response(SITEMAP_BASIC, headers={'ETag': '"v1"'})
+        cache = {}
+
+        pages = discover_claude_code_pages(session, "https://platform.claude.com/sitemap.xml", cache=cache)
+
+        assert cache == {
+            "https://platform.claude.com/sitemap.xml": {
+                "etag": '"v1"', "base_url": "https://platform.claude.com", "pages": pages
+            }
+        }
+        assert 'If-None-Match' not in session.get.call_args.kwargs['headers']
+
+    def test_discover_not_modified_uses_cache(self, session):
+        """Test a 304 response returns cached paths without parsing."""
+        session.get.return_value = mock_response(status=304)
+        cache = {"https://platform.claude.com/sitemap.xml": {"etag": '"v1"', "pages": ["/en/docs/cached"]}}
 
+        pages = discover_claude_code_pages(session, "https://platform.claude.com/sitemap.xml", cache=cache)
+
+        assert pages == ["/en/docs/cached"]
+        assert session.get.call_args.kwargs['headers']['If-None-Match'] == '"v1"'
+
+
+@pytest.mark.parallel_safe
 class TestValidateMarkdownContent:
     """Test markdown content validation."""
 
@@ -495,6 +568,17 @@ class TestValidateMarkdownContent:
         with pytest.raises(ValueError):
             validate_markdown_content(content, "test.md")
 
+    def test_validate_markdown_rejects_lowercase_doctype(self):
+        """Test the HTML check is case-insensitive."""
+        content = "<!doctype html>\n# Title\n## Usage\n- Claude Code example with enough content here"
+        with pytest.raises(ValueError, match="HTML"):
+            validate_markdown_content(content, "test.md")
+
+    def test_validate_markdown_allows_doctype_in_code_block(self):
+        """Test a page whose opening code sample shows a doctype is still markdown."""
+        content = "# HTML output\n\n```\n<!DOCTYPE html>\n```\n\n## Usage\nClaude Code example with enough content"
+        validate_markdown_content(content, "test.md")
+
     def test_validate_markdown_rejects_short_content(self):
         """Test very short content is rejected."""
         content = "short"
@@ -544,6 +628,333 @@ class TestValidateMarkdownContent:
             validate_markdown_content(content, "test.md")
 
 
+class TestFetchMarkdownContent:
+    """Test markdown fetching with conditional requests."""
+
+    MARKDOWN = "# Hooks\n\n## Usage\n\n- Configure hooks in Claude Code settings\n- Example below\n"
+
+    def test_fetch_returns_validators(self, session):
+        """Test ETag/Last-Modified are returned for storage in the manifest."""
+        response = Mock()
+        response.status_code = 200
+        response.encoding = 'utf-8'
+        response.iter_content.return_value = [self.MARKDOWN.encode('utf-8')]
+        response.headers = {'ETag': '"abc"', 'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'}
+
+        session.get.return_value = response
+
+        filename, content, validators = fetch_markdown_content("/docs/en/hooks", session, "")
+
+        assert filename == "claude-code__hooks.md"
+        assert content == self.MARKDOWN.encode('utf-8')
+        assert validators == {'etag': '"abc"', 'last_modified': 'Wed, 21 Oct 2015 07:28:00 GMT'}
+        sent_headers = session.get.call_args.kwargs['headers']
+        assert 'If-None-Match' not in sent_headers
+
+    def test_fetch_paces_every_attempt_and_defers_on_429(self, session):
+        """Test each attempt waits for the limiter and a 429 pauses all workers."""
+        limited = mock_response(status=429, headers={'Retry-After': '5'})
+        ok = Mock(status_code=200, encoding='utf-8', headers={})
+        ok.iter_content.return_value = [self.MARKDOWN.encode('utf-8')]
+        session.get.side_effect = [limited, ok]
+        limiter = Mock(spec=RateLimiter)
+
+        with patch('fetcher.content.time.sleep') as mock_sleep:
+            _, content, _ = fetch_markdown_content("/docs/en/hooks", session, "", limiter=limiter)
+
+        assert content == self.MARKDOWN.encode('utf-8')
+        assert limiter.acquire.call_count == 2
+        limiter.defer.assert_called_once_with(5)
+        mock_sleep.assert_not_called()
+
+    def test_fetch_not_modified(self, session):
+        """Test a 304 response skips the body and keeps previous validators."""
+        session.get.return_value = mock_response(status=304)
+
+        filename, content, validators = fetch_markdown_content(
+            "/docs/en/hooks", session, "", etag='"abc"', last_modified="Wed, 21 Oct 2015 07:28:00 GMT"
+        )
+
+        assert content is None
+        assert validators['etag'] == '"abc"'
+        sent_headers = session.get.call_args.kwargs['headers']
+        assert sent_headers['If-None-Match'] == '"abc"'
+        assert sent_headers['If-Modified-Since'] == "Wed, 21 Oct 2015 07:28:00 GMT"
+
+
+class TestSaveMarkdownFile:
+    """Test saving fetched pages."""
+
+    def test_save_writes_bytes_atomically(self, tmp_path):
+        """Test content is written as-is and no temp file is left behind."""
+        (tmp_path / "page.md").write_text("old")
+
+        content_hash = save_markdown_file(tmp_path, "page.md", "# Título\n".encode('utf-8'))
+
+        assert (tmp_path / "page.md").read_bytes() == "# Título\n".encode('utf-8')
+        assert content_hash == compute_content_hash("# Título\n")
+        assert [p.name for p in tmp_path.iterdir()] == ["page.md"]
+
+
+class TestContentHash:
+    """Test content hashing used for change detection."""
+
+    def test_text_and_bytes_hash_equal(self):
+        """Test text is hashed as its UTF-8 bytes."""
+        assert compute_content_hash("héllo") == compute_content_hash("héllo".encode('utf-8'))
+
+    def test_legacy_sha256_hash_still_matches(self):
+        """Test content is compared against hashes written with SHA256."""
+        old_hash = hashlib.sha256(b"content").hexdigest()
+
+        assert compute_content_hash(b"content", "sha256") == old_hash
+        assert not content_has_changed(b"content", old_hash, "sha256")
+        assert content_has_changed(b"changed", old_hash, "sha256")
+
+    def test_fetcher_requires_xxhash(self):
+        """Test an xxh3 manifest can't be processed without xxhash (no mass rehash).
+
+        The fetcher refuses to import rather than falling back to another
+        algorithm and reporting every page as changed.
+        """
+        scripts_dir = Path(__file__).parent.parent.parent / "scripts"
+        code = "import sys; sys.modules['xxhash'] = None; sys.path.insert(0, sys.argv[1]); import fetcher"
+
+        result = subprocess.run([sys.executable, "-c", code, str(scripts_dir)], capture_output=True, text=True)
+
+        assert result.returncode != 0
+        assert "xxhash" in result.stderr
+
+    def test_unknown_algorithm_counts_as_changed(self):
+        """Test hashes from an unavailable algorithm never match."""
+        assert content_has_changed(b"content", "0123", "md4-unknown")
+        with pytest.raises(ValueError):
+            compute_content_hash(b"content", "md4-unknown")
+
+
+class TestMain:
+    """Test main() end to end against a mock docs site."""
+
+    PAGES = ("/docs/en/hooks", "/docs/en/api/messages")
+    CHANGELOG = b"# Changelog\n\n" + b"- Fixed a bug in the hooks runner\n" * 5
+
+    @staticmethod
+    def page(path, version):
+        """Markdown body and ETag for a version of a page."""
+        body = f"# {path}\n\n## Usage\n\n- Claude Code example\n- Version {version}\n".encode()
+        return body, f'"{path}-v{version}"'
+
+    @staticmethod
+    def page_url(path):
+        return f"{get_base_url_for_path(path)}{convert_legacy_path_to_fetch_url(path)}.md"
+
+    @pytest.fixture
+    def site(self, session, monkeypatch):
+        """Pages served by the mock session (path -> (body, etag)), with discovery patched."""
+        pages = {path: self.page(path, 1) for path in self.PAGES}
+
+        def get(url, headers=None, **kwargs):
+            if url.endswith("/CHANGELOG.md"):
+                return mock_response(self.CHANGELOG)
+            body, etag = next(pages[path] for path in pages if self.page_url(path) == url)
+            if (headers or {}).get('If-None-Match') == etag:
+                return mock_response(status=304)
+            response = Mock(status_code=200, encoding='utf-8', headers={'ETag': etag})
+            response.iter_content.return_value = [body]
+            return response
+
+        session.get.side_effect = get
+        session.__enter__ = Mock(return_value=session)
+        session.__exit__ = Mock(return_value=False)
+        monkeypatch.setattr('fetcher.cli.create_session', lambda: session)
+        monkeypatch.setattr('fetcher.cli.RATE_LIMIT_DELAY', 0)
+        monkeypatch.setattr(
+            'fetcher.cli.discover_sitemap_and_base_url',
+            lambda *args, **kwargs: ("https://platform.claude.com/sitemap.xml", "https://platform.claude.com"),
+        )
+        monkeypatch.setattr('fetcher.cli.discover_from_all_sitemaps', lambda *args, **kwargs: sorted(pages))
+        monkeypatch.setattr('fetcher.cli.validate_discovery_threshold', lambda paths: paths)
+        monkeypatch.setattr('fetcher.cli.update_paths_manifest', Mock())
+        monkeypatch.setattr('fetcher.cli.validate_repository_config', Mock())
+        return pages
+
+    @pytest.fixture
+    def out_dir(self, tmp_path):
+        return tmp_path / "docs"
+
+    @staticmethod
+    def snapshot(out_dir):
+        """Content and modification time of every page and the manifest."""
+        return {
+            f.name: (f.read_bytes(), f.stat().st_mtime_ns)
+            for f in out_dir.iterdir()
+            if f.suffix == ".md" or f.name == MANIFEST_FILE
+        }
+
+    @staticmethod
+    def read_manifest(out_dir):
+        return json.loads((out_dir / MANIFEST_FILE).read_text())
+
+    @classmethod
+    def write_legacy_manifest(cls, out_dir):
+        """Rewrite the manifest as a pre-hash_algo SHA256 one, without ETags."""
+        manifest = cls.read_manifest(out_dir)
+        del manifest["hash_algo"]
+        for filename, entry in manifest["files"].items():
+            entry.pop("etag", None)
+            entry["hash"] = hashlib.sha256((out_dir / filename).read_bytes()).hexdigest()
+        (out_dir / MANIFEST_FILE).write_text(json.dumps(manifest))
+        return manifest
+
+    def test_first_run_creates_files(self, site, out_dir):
+        """Test a first run saves every page and records hash_algo and ETags."""
+        main(out_dir)
+
+        manifest = self.read_manifest(out_dir)
+        assert manifest["hash_algo"] == HASH_ALGO
+        for path, (body, etag) in site.items():
+            filename = url_to_safe_filename(path)
+            assert (out_dir / filename).read_bytes() == body
+            assert manifest["files"][filename]["etag"] == etag
+            assert manifest["files"][filename]["hash"] == compute_content_hash(body)
+        assert (out_dir / "changelog.md").exists()
+
+    def test_all_not_modified_writes_nothing(self, site, session, out_dir):
+        """Test a run where every page returns 304 leaves pages and manifest untouched."""
+        main(out_dir)
+        before = self.snapshot(out_dir)
+        session.get.reset_mock()
+
+        main(out_dir)
+
+        assert self.snapshot(out_dir) == before
+        sent = [c.kwargs['headers'].get('If-None-Match') for c in session.get.call_args_list
+                if not c.args[0].endswith("/CHANGELOG.md")]
+        assert sorted(sent) == sorted(etag for _, etag in site.values())
+
+    def test_changed_page_rewrites_only_that_file(self, site, out_dir):
+        """Test only the changed page and the manifest are rewritten."""
+        main(out_dir)
+        before = self.snapshot(out_dir)
+        old_manifest = self.read_manifest(out_dir)
+        changed, unchanged = (url_to_safe_filename(path) for path in self.PAGES)
+        site[self.PAGES[0]] = self.page(self.PAGES[0], 2)
+
+        main(out_dir)
+
+        after = self.snapshot(out_dir)
+        assert after[changed][0] == site[self.PAGES[0]][0]
+        assert after[unchanged] == before[unchanged]
+        assert after["changelog.md"] == before["changelog.md"]
+        manifest = self.read_manifest(out_dir)
+        assert manifest["files"][changed]["etag"] == site[self.PAGES[0]][1]
+        assert manifest["files"][unchanged] == old_manifest["files"][unchanged]
+
+    def test_legacy_sha256_manifest_migrates_without_rewrites(self, site, out_dir):
+        """Test a manifest without hash_algo is rehashed, keeping files and timestamps."""
+        main(out_dir)
+        manifest = self.write_legacy_manifest(out_dir)
+        before = self.snapshot(out_dir)
+
+        main(out_dir)
+
+        migrated = self.read_manifest(out_dir)
+        assert migrated["hash_algo"] == HASH_ALGO
+        for filename, entry in migrated["files"].items():
+            assert entry["last_updated"] == manifest["files"][filename]["last_updated"]
+            assert entry["hash"] == compute_content_hash((out_dir / filename).read_bytes())
+            assert self.snapshot(out_dir)[filename] == before[filename]
+
+    @pytest.fixture
+    def checkpoints(self, out_dir, monkeypatch):
+        """Manifest contents as written by each checkpoint, one per page."""
+        written = []
+
+        def record(*args, **kwargs):
+            checkpoint_manifest(*args, **kwargs)
+            written.append(self.read_manifest(out_dir))
+
+        monkeypatch.setattr('fetcher.cli.CHECKPOINT_INTERVAL', 1)
+        monkeypatch.setattr('fetcher.cli.checkpoint_manifest', record)
+        return written
+
+    def test_first_run_writes_checkpoints(self, site, out_dir, checkpoints):
+        """Test a first run with an empty manifest checkpoints every CHECKPOINT_INTERVAL pages."""
+        main(out_dir)
+
+        assert [len(c["files"]) for c in checkpoints] == [1, 2]
+        assert all(c["hash_algo"] == HASH_ALGO for c in checkpoints)
+
+    def test_legacy_manifest_checkpoints_keep_unvisited_entries(self, site, out_dir, checkpoints):
+        """Test a rehash checkpoint keeps pages not reached yet, tagged with their old algorithm."""
+        main(out_dir)
+        legacy = self.write_legacy_manifest(out_dir)
+        checkpoints.clear()
+
+        main(out_dir)
+
+        first = checkpoints[0]
+        assert first["hash_algo"] == HASH_ALGO
+        assert first["files"].keys() == legacy["files"].keys()
+        rehashed = [name for name, entry in first["files"].items() if "hash_algo" not in entry]
+        assert len(rehashed) == 1
+        for filename, entry in first["files"].items():
+            if filename in rehashed:
+                assert entry["hash"] == compute_content_hash((out_dir / filename).read_bytes())
+                assert entry["last_updated"] == legacy["files"][filename]["last_updated"]
+            else:
+                assert entry == {**legacy["files"][filename], "hash_algo": "sha256"}
+
+    def test_resume_after_interrupted_rehash(self, site, out_dir, checkpoints):
+        """Test a run resumed from a mid-rehash checkpoint finishes the migration without rewrites."""
+        main(out_dir)
+        legacy = self.write_legacy_manifest(out_dir)
+        checkpoints.clear()
+        main(out_dir)
+        (out_dir / MANIFEST_FILE).write_text(json.dumps(checkpoints[0]))
+        before = self.snapshot(out_dir)
+
+        main(out_dir)
+
+        migrated = self.read_manifest(out_dir)
+        assert migrated["files"].keys() == legacy["files"].keys()
+        for filename, entry in migrated["files"].items():
+            assert "hash_algo" not in entry
+            assert entry["hash"] == compute_content_hash((out_dir / filename).read_bytes())
+            assert entry["last_updated"] == legacy["files"][filename]["last_updated"]
+            assert self.snapshot(out_dir)[filename] == before[filename]
+
+
+class TestCreateSession:
+    """Test HTTP session configuration."""
+
+    def test_session_mounts_retrying_adapter(self):
+        """Test HTTPS requests go through a pooled adapter retrying connections only."""
+        with create_session() as session:
+            adapter = session.get_adapter("https://platform.claude.com/sitemap.xml")
+
+            assert adapter.max_retries.connect > 0
+            assert adapter.max_retries.read == 0
+            assert not adapter.max_retries.status_forcelist  # HTTP errors retried by the fetch loop
+            assert adapter._pool_maxsize == MAX_WORKERS
+
+
+class TestCleanupOldFiles:
+    """Test removal of files dropped from the sitemap."""
+
+    def test_removes_only_previously_fetched_files(self, tmp_path):
+        """Test obsolete fetched files are deleted and manual files preserved."""
+        for name in ("keep.md", "obsolete.md", "manual.md"):
+            (tmp_path / name).write_text("x")
+        manifest = {"files": {"keep.md": {}, "obsolete.md": {}, "gone.md": {}}}
+
+        with patch('fetcher.safeguards.MIN_EXPECTED_FILES', 0), \
+                patch('fetcher.safeguards.MAX_DELETION_PERCENT', 100):
+            cleanup_old_files(tmp_path, {"keep.md"}, manifest, {"keep.md", "obsolete.md", "manual.md"})
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["keep.md", "manual.md"]
+
+
 class TestHeadersConstant:
     """Test HEADERS configuration."""
 
@@ -571,6 +982,60 @@ class TestManifestFile:
         assert MANIFEST_FILE.endswith(".json")
 
 
+class TestRateLimiter:
+    """Test the shared request rate limiter."""
+
+    def test_first_request_does_not_block(self):
+        """Test the first request starts immediately."""
+        limiter = RateLimiter(60)
+
+        with patch('fetcher.ratelimit.time.sleep') as mock_sleep:
+            limiter.acquire()
+
+        mock_sleep.assert_not_called()
+
+    def test_back_to_back_requests_are_spaced(self):
+        """Test concurrent callers reserve consecutive start slots."""
+        with patch('fetcher.ratelimit.time.monotonic', return_value=100.0):
+            limiter = RateLimiter(0.5)
+            with patch('fetcher.ratelimit.time.sleep') as mock_sleep:
+                for _ in range(3):
+                    limiter.acquire()
+
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [0.5, 1.0]
+
+    def test_elapsed_time_counts_toward_interval(self):
+        """Test no sleep when the previous request took longer than the interval."""
+        clock = iter([100.0, 100.0, 101.0])
+        with patch('fetcher.ratelimit.time.monotonic', side_effect=lambda: next(clock)):
+            limiter = RateLimiter(0.5)
+            with patch('fetcher.ratelimit.time.sleep') as mock_sleep:
+                limiter.acquire()
+                limiter.acquire()
+
+        mock_sleep.assert_not_called()
+
+    def test_defer_pushes_back_next_request(self):
+        """Test defer() delays the next request for every caller."""
+        with patch('fetcher.ratelimit.time.monotonic', return_value=100.0):
+            limiter = RateLimiter(0.5)
+            limiter.defer(10)
+            with patch('fetcher.ratelimit.time.sleep') as mock_sleep:
+                limiter.acquire()
+
+        mock_sleep.assert_called_once_with(10.0)
+
+    def test_zero_interval_disables_limiting(self):
+        """Test a non-positive interval never blocks."""
+        limiter = RateLimiter(0)
+
+        with patch('fetcher.ratelimit.time.sleep') as mock_sleep:
+            for _ in range(10):
+                limiter.acquire()
+
+        mock_sleep.assert_not_called()
+
+
 class TestGetBaseUrlForPath:
     """Test base URL determination for different documentation paths."""
 